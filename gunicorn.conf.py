@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+"""
+gunicorn配置 - gunicorn从工作目录自动加载本文件（start.sh中的命令行参数优先）
+
+后台任务、进度事件缓冲和常驻进程池都保存在工作进程的内存中，因此只运行一个工作进程：
+多个工作进程时，查询任务、订阅事件和取消请求可能落到没有该任务的进程上而返回404。
+并发由线程（gthread）承担；优化计算在常驻进程池中执行，不受线程数限制。
+"""
+
+import os
+
+workers = 1
+worker_class = 'gthread'
+
+# 每个进度事件流（SSE）连接在整个任务期间占用一个线程，线程数须大于同时订阅的客户端数
+threads = int(os.environ.get('THREADS', 16))
+
+# gthread的timeout是工作进程主循环的心跳超时，不限制单个请求的时长，
+# 长时间的进度事件流和后台任务不会因此被终止
+timeout = 120
+
+
+def post_worker_init(worker):
+    """工作进程加载应用后预热优化用的常驻进程池"""
+    from src.web.app import worker_pool
+    worker_pool.start()
@@ -12,10 +12,13 @@ import argparse
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.core.po_adjustment import POOptimizer
-from src.core.visualization import POVisualizer
+from src.core.pipeline import OptimizationPipeline
+from src.core.work_calendar import PlanningCalendar
 
 
-def run_cli(schedule_file, po_file, output_dir='data/output'):
+def run_cli(schedule_file, po_file, output_dir='data/output', time_budget=None, sku_time_budget=None,
+            engine='greedy', seed=None, calendar_file=None, start_date=None, end_date=None,
+            output_format='xlsx'):
     """
     命令行模式运行优化
 
@@ -23,6 +26,14 @@ def run_cli(schedule_file, po_file, output_dir='data/output'):
         schedule_file: 排程目标文件路径
         po_file: PO清单文件路径
         output_dir: 输出目录
+        time_budget: 整批优化的时间预算（秒）
+        sku_time_budget: 单个SKU的时间预算（秒）
+        engine: 优化引擎（greedy / lns / exact）
+        seed: 随机种子（lns引擎使用），None表示随机种子并按时间限制结束
+        calendar_file: 规划日历配置文件（JSON，含规划期和节假日）
+        start_date: 规划期开始日期（覆盖配置文件）
+        end_date: 规划期结束日期（覆盖配置文件）
+        output_format: 结果文件格式（xlsx / csv / parquet）
     """
     print("=" * 80)
     print("PO清单分箱优化系统 - 命令行模式")
@@ -37,11 +48,14 @@ def run_cli(schedule_file, po_file, output_dir='data/output'):
         print("步骤 1/2: 执行PO日期优化...")
         print("-" * 80)
 
-        optimizer = POOptimizer(schedule_file, po_file)
-        optimized_po = optimizer.optimize(max_workers=4)
+        calendar = PlanningCalendar.load(calendar_file, start_date=start_date, end_date=end_date)
+        # 输入只加载一次，优化结果在内存中直接用于可视化，文件只作为最终产物写出
+        pipeline = OptimizationPipeline(schedule_file, po_file, calendar=calendar)
+        pipeline.run(max_workers=4, time_budget=time_budget, sku_time_budget=sku_time_budget,
+                     engine=engine, seed=seed)
 
-        result_file = os.path.join(output_dir, 'po_lists_optimized.xlsx')
-        optimizer.save_results(optimized_po, result_file)
+        result_file = os.path.join(output_dir, f'po_lists_optimized.{output_format}')
+        pipeline.save_results(result_file)
 
         print("\n优化完成！")
         print()
@@ -51,9 +65,9 @@ def run_cli(schedule_file, po_file, output_dir='data/output'):
         print("步骤 2/2: 生成可视化对比...")
         print("-" * 80)
 
-        visualizer = POVisualizer(schedule_file, po_file, result_file)
+        visualizer = pipeline.visualizer
 
-        report_file = os.path.join(output_dir, 'comparison_report.xlsx')
+        report_file = os.path.join(output_dir, f'comparison_report.{output_format}')
         comparison_chart = os.path.join(output_dir, 'po_comparison.png')
         deviation_chart = os.path.join(output_dir, 'deviation_comparison.png')
 
@@ -67,10 +81,9 @@ def run_cli(schedule_file, po_file, output_dir='data/output'):
         print("所有任务完成！")
         print("=" * 80)
         print("\n生成的文件:")
-        print(f"  1. {result_file}")
-        print(f"  2. {report_file}")
-        print(f"  3. {comparison_chart}")
-        print(f"  4. {deviation_chart}")
+        output_files = [result_file] + visualizer.report_files + [comparison_chart, deviation_chart]
+        for i, path in enumerate(output_files, 1):
+            print(f"  {i}. {path}")
         print()
 
     except Exception as e:
@@ -122,11 +135,29 @@ def main():
     # CLI模式
     cli_parser = subparsers.add_parser('cli', help='命令行模式')
     cli_parser.add_argument('-s', '--schedule', required=True,
-                           help='排程目标文件路径')
+                           help='排程目标文件路径 (.xlsx/.xls/.csv/.parquet/.feather)')
     cli_parser.add_argument('-p', '--po', required=True,
-                           help='PO清单文件路径')
+                           help='PO清单文件路径 (.xlsx/.xls/.csv/.parquet/.feather)')
     cli_parser.add_argument('-o', '--output', default='data/output',
                            help='输出目录 (默认: data/output)')
+    cli_parser.add_argument('-f', '--format', choices=('xlsx', 'csv', 'parquet'), default='xlsx',
+                           help='结果和汇总报告的文件格式 (默认: xlsx)')
+    cli_parser.add_argument('--time-budget', type=float, default=None,
+                           help='整批优化的时间预算，单位秒 (默认: 不限制)')
+    cli_parser.add_argument('--sku-time-budget', type=float, default=None,
+                           help='单个SKU的时间预算，单位秒 (默认: 不限制)')
+    cli_parser.add_argument('--engine', choices=POOptimizer.ENGINES, default='greedy',
+                           help='优化引擎: greedy=贪心+局部搜索, lns=再加模拟退火大邻域搜索, '
+                                'exact=小规模SKU分支定界求最优 (默认: greedy)')
+    cli_parser.add_argument('--seed', type=int, default=None,
+                           help='随机种子，lns引擎使用；指定时lns按迭代次数结束，相同种子结果可复现 '
+                                '(默认: 随机种子，lns按时间限制结束)')
+    cli_parser.add_argument('--calendar', default=None,
+                           help='规划日历配置文件 (JSON，含start_date/end_date/holidays，默认: 内置2025-2026日历)')
+    cli_parser.add_argument('--start-date', default=None,
+                           help='规划期开始日期，覆盖日历配置 (如 2025-10-01)')
+    cli_parser.add_argument('--end-date', default=None,
+                           help='规划期结束日期，覆盖日历配置 (如 2027-12-31)')
 
     # Web模式
     web_parser = subparsers.add_parser('web', help='Web界面模式')
@@ -140,7 +171,8 @@ def main():
     args = parser.parse_args()
 
     if args.mode == 'cli':
-        run_cli(args.schedule, args.po, args.output)
+        run_cli(args.schedule, args.po, args.output, args.time_budget, args.sku_time_budget,
+                args.engine, args.seed, args.calendar, args.start_date, args.end_date, args.format)
     elif args.mode == 'web':
         run_web(args.host, args.port, not args.no_debug)
     else:
@@ -24,8 +24,8 @@ if [ $? -ne 0 ]; then
     pip3 install -r requirements.txt
 fi
 
-# 创建必要的目录
-mkdir -p data/uploads data/output
+# 创建必要的目录（每次上传的输入、缓存和结果保存在 data/workspaces/<workspace_id>/ 下）
+mkdir -p data/workspaces data/output
 
 # 启动应用
 echo ""
@@ -2,7 +2,8 @@
 核心优化算法模块
 """
 
-from .po_adjustment import POOptimizer
+from .po_adjustment import POOptimizer, OptimizationCancelled
 from .visualization import POVisualizer
+from .pipeline import OptimizationPipeline
 
-__all__ = ['POOptimizer', 'POVisualizer']
+__all__ = ['POOptimizer', 'OptimizationCancelled', 'POVisualizer', 'OptimizationPipeline']
@@ -8,54 +8,98 @@ import pandas as pd
 import numpy as np
 from datetime import datetime
 
+from .weeks import week_key
+
 
 class ScheduleTransformer:
     """排程表格式转换器"""
 
-    @staticmethod
-    def detect_format(df):
+    @classmethod
+    def detect_schema(cls, columns):
         """
-        检测文件格式
+        根据表头检测排程表格式，并给出列映射
+
+        只使用列名，可在读取整张表之前用表头（或少量样本行）判断解析方式。
 
         Args:
-            df: pandas DataFrame
+            columns: 列名序列（如 DataFrame.columns）
 
         Returns:
-            str: 'cross_table' (二维交叉表) 或 'long_format' (长表格式)
+            dict: format - 'cross_table' / 'long_format' / 'unknown'
+                  columns_map - 长表原列名 -> 标准列名（日期/SKU/计划产量）
+                  sku_column - 交叉表的SKU列名
+                  date_columns - 交叉表的日期列名
         """
+        columns = list(columns)
+        schema = {'format': 'unknown', 'columns_map': {}, 'sku_column': None, 'date_columns': []}
+        if not columns:
+            return schema
+
         # 检查是否为长表格式
         # 长表格式特征：有'日期', 'SKU', '计划产量'等列
-        columns = [str(col).lower() for col in df.columns]
-
-        if any(keyword in col for col in columns for keyword in ['日期', 'date']):
-            if any(keyword in col for col in columns for keyword in ['sku', '产品']):
-                if any(keyword in col for col in columns for keyword in ['计划', '产量', '数量', 'quantity']):
-                    return 'long_format'
+        lowered = [str(col).lower() for col in columns]
+
+        if any(keyword in col for col in lowered for keyword in ['日期', 'date']):
+            if any(keyword in col for col in lowered for keyword in ['sku', '产品']):
+                if any(keyword in col for col in lowered for keyword in ['计划', '产量', '数量', 'quantity']):
+                    # 标准化列名
+                    columns_map = {}
+                    for col, col_lower in zip(columns, lowered):
+                        if '日期' in col_lower or 'date' in col_lower:
+                            columns_map[col] = '日期'
+                        elif 'sku' in col_lower:
+                            columns_map[col] = 'SKU'
+                        elif '计划' in col_lower or '产量' in col_lower or 'quantity' in col_lower:
+                            columns_map[col] = '计划产量'
+                    schema.update(format='long_format', columns_map=columns_map)
+                    return schema
 
         # 检查是否为交叉表格式
         # 交叉表特征：第一列是SKU，其他列是日期
-        first_col = str(df.columns[0]).lower()
-        if 'sku' in first_col or 'date' in first_col:
-            # 检查其他列是否为日期类型
-            date_cols = 0
-            for col in df.columns[1:]:
-                if isinstance(col, (datetime, pd.Timestamp)):
-                    date_cols += 1
-                elif isinstance(col, str):
-                    try:
-                        pd.to_datetime(col)
-                        date_cols += 1
-                    except:
-                        pass
+        if 'sku' in lowered[0] or 'date' in lowered[0]:
+            # 日期类型的列名直接计入，字符串列名一次性批量解析
+            headers = columns[1:]
+            is_date = np.array([isinstance(col, (datetime, pd.Timestamp)) for col in headers], dtype=bool)
+            is_text = np.array([isinstance(col, str) for col in headers], dtype=bool)
+            if is_text.any():
+                texts = pd.Index([col for col in headers if isinstance(col, str)], dtype=object)
+                is_date[is_text] = pd.to_datetime(texts, format='mixed', errors='coerce').notna()
 
             # 如果大部分列是日期，判定为交叉表
-            if date_cols >= len(df.columns) * 0.5:
-                return 'cross_table'
+            if is_date.sum() >= len(columns) * 0.5:
+                schema.update(format='cross_table', sku_column=columns[0], date_columns=headers)
+
+        return schema
+
+    @classmethod
+    def detect_format(cls, df):
+        """
+        检测文件格式
+
+        Args:
+            df: pandas DataFrame
 
-        return 'unknown'
+        Returns:
+            str: 'cross_table' (二维交叉表) 或 'long_format' (长表格式)
+        """
+        return cls.detect_schema(df.columns)['format']
 
     @staticmethod
-    def transform_cross_table_to_long(df):
+    def parse_date_headers(columns):
+        """
+        批量解析交叉表的日期列名
+
+        Args:
+            columns: 列名序列（datetime、Timestamp或日期字符串）
+
+        Returns:
+            DatetimeIndex: 解析后的日期
+        """
+        # 各列名格式可能不同（Excel日期、文本日期混用），逐个推断格式
+        return pd.DatetimeIndex(pd.to_datetime(pd.Index(columns, dtype=object), format='mixed'))
+
+    @classmethod
+    def transform_cross_table_to_long(cls, df, drop_zeros=False):
         """
         将二维交叉表转换为长表格式
 
@@ -64,56 +108,28 @@ class ScheduleTransformer:
                 第一列: SKU
                 其他列: 日期（列名）
                 单元格: 排程数量
+            drop_zeros: 是否去掉数量为0（含空单元格）的记录，默认保留
 
         Returns:
             DataFrame: 长表格式，包含列 [日期, SKU, 计划产量]
         """
-        # 获取SKU列名（第一列）
-        sku_col_name = df.columns[0]
-
-        # 提取SKU列
-        skus = df[sku_col_name].values
-
-        # 获取日期列（除第一列外的所有列）
-        date_columns = df.columns[1:]
-
-        # 转换日期列为标准格式
-        dates = []
-        for col in date_columns:
-            if isinstance(col, (datetime, pd.Timestamp)):
-                dates.append(col)
-            else:
-                try:
-                    dates.append(pd.to_datetime(col))
-                except:
-                    dates.append(col)
-
-        # 准备结果列表
-        result_data = []
-
-        # 遍历每个SKU
-        for idx, sku in enumerate(skus):
-            # 遍历每个日期列
-            for date_idx, (date_col, date) in enumerate(zip(date_columns, dates)):
-                quantity = df.iloc[idx, date_idx + 1]  # +1因为第一列是SKU
-
-                # 跳过NaN值
-                if pd.isna(quantity):
-                    quantity = 0
-
-                # 只保留数量 > 0 的记录（可选）
-                # if quantity > 0:
-                result_data.append({
-                    '日期': date,
-                    'SKU': sku,
-                    '计划产量': int(quantity) if not pd.isna(quantity) else 0
-                })
-
-        # 创建DataFrame
-        result_df = pd.DataFrame(result_data)
-
-        # 确保日期格式正确
-        result_df['日期'] = pd.to_datetime(result_df['日期'])
+        # 第一列为SKU，其余列为日期
+        skus = df.iloc[:, 0].to_numpy()
+        dates = cls.parse_date_headers(df.columns[1:])
+
+        # 数量矩阵按行展开（SKU × 日期），空值记为0，取整方式与int()一致
+        quantities = df.iloc[:, 1:].to_numpy(dtype=float)
+        quantities = np.nan_to_num(quantities, nan=0.0).astype(np.int64).ravel()
+
+        result_df = pd.DataFrame({
+            '日期': np.tile(dates.to_numpy(), len(skus)),
+            'SKU': np.repeat(skus, len(dates)),
+            '计划产量': quantities
+        })
+
+        # 只保留数量不为0的记录（可选）
+        if drop_zeros:
+            result_df = result_df[result_df['计划产量'] != 0]
 
         # 按日期和SKU排序
         result_df = result_df.sort_values(['日期', 'SKU']).reset_index(drop=True)
@@ -137,48 +153,33 @@ class ScheduleTransformer:
         # 确保日期列为datetime类型
         df[date_column] = pd.to_datetime(df[date_column])
 
-        # 计算周编号 (格式: YYYYWW)
-        df['week_num'] = df[date_column].dt.strftime('%Y%U')
+        # 计算ISO周编号 (格式: YYYYWW)，与优化器、差异分析和可视化使用同一定义
+        df['week_num'] = week_key(df[date_column])
 
         return df
 
     @classmethod
-    def process_schedule_file(cls, file_path, output_path=None):
+    def normalize(cls, df, drop_zeros=False, schema=None):
         """
-        处理排程文件：自动检测格式并转换
+        排程表标准化：自动检测格式，交叉表转换为长表，长表统一列名，并添加周编号
 
         Args:
-            file_path: 输入文件路径
-            output_path: 输出文件路径（可选）
+            df: 排程表DataFrame（交叉表或长表）
+            drop_zeros: 交叉表转换时是否去掉数量为0的记录
+            schema: 已由表头检测得到的格式（detect_schema的结果），None表示根据df检测
 
         Returns:
-            DataFrame: 处理后的长表格式DataFrame
+            tuple: (长表格式DataFrame, 检测到的格式)
         """
-        # 读取文件
-        df = pd.read_excel(file_path)
-
-        # 检测格式
-        format_type = cls.detect_format(df)
-
-        print(f"检测到文件格式: {format_type}")
+        if schema is None:
+            schema = cls.detect_schema(df.columns)
+        format_type = schema['format']
 
         if format_type == 'cross_table':
-            print("执行格式转换: 交叉表 -> 长表")
-            df_long = cls.transform_cross_table_to_long(df)
+            df_long = cls.transform_cross_table_to_long(df, drop_zeros=drop_zeros)
         elif format_type == 'long_format':
-            print("文件已是长表格式，无需转换")
-            df_long = df.copy()
             # 标准化列名
-            columns_map = {}
-            for col in df_long.columns:
-                col_lower = str(col).lower()
-                if '日期' in col_lower or 'date' in col_lower:
-                    columns_map[col] = '日期'
-                elif 'sku' in col_lower:
-                    columns_map[col] = 'SKU'
-                elif '计划' in col_lower or '产量' in col_lower or 'quantity' in col_lower:
-                    columns_map[col] = '计划产量'
-            df_long = df_long.rename(columns=columns_map)
+            df_long = df.rename(columns=schema['columns_map'])
         else:
             raise ValueError(f"无法识别的文件格式。请确保文件为交叉表或长表格式。")
 
@@ -186,6 +187,31 @@ class ScheduleTransformer:
         if '日期' in df_long.columns:
             df_long = cls.add_week_number(df_long)
 
+        return df_long, format_type
+
+    @classmethod
+    def process_schedule_file(cls, file_path, output_path=None):
+        """
+        处理排程文件：自动检测格式并转换
+
+        Args:
+            file_path: 输入文件路径
+            output_path: 输出文件路径（可选）
+
+        Returns:
+            DataFrame: 处理后的长表格式DataFrame
+        """
+        # 先按表头检测格式，再读取并转换
+        from .input_cache import read_schedule
+        df_long, schema = read_schedule(file_path)
+        format_type = schema['format']
+
+        print(f"检测到文件格式: {format_type}")
+        if format_type == 'cross_table':
+            print("已执行格式转换: 交叉表 -> 长表")
+        else:
+            print("文件已是长表格式，无需转换")
+
         # 保存文件（如果指定了输出路径）
         if output_path:
             df_long.to_excel(output_path, index=False)
@@ -193,15 +219,14 @@ class ScheduleTransformer:
 
         return df_long
 
-
 def main():
     """测试函数"""
     import sys
 
     if len(sys.argv) < 2:
-        print("用法: python data_transformer.py <input_file> [output_file]")
+        print("用法: python -m src.core.data_transformer <input_file> [output_file]")
         print("\n示例:")
-        print("  python data_transformer.py data/input/shechle.xlsx data/output/converted.xlsx")
+        print("  python -m src.core.data_transformer data/input/shechle.xlsx data/output/converted.xlsx")
         return
 
     input_file = sys.argv[1]
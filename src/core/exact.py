@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+精确求解模块 - PO到周分配的分支定界，以及加权偏差的下界
+"""
+
+import time
+import numpy as np
+
+
+def relaxation_bound(residual, weights, remaining_qty, weight_order, min_weight):
+    """
+    连续松弛下界：剩余数量可以任意拆分时，候选周加权偏差之和的最小值
+
+    拆分后的最优解为：按权重从高到低填补缺货周，剩余部分放入权重最低的候选周。
+
+    Args:
+        residual: 候选周当前残差列表（实际-目标）
+        weights: 候选周权重列表
+        remaining_qty: 尚未分配的PO总量
+        weight_order: 候选周按权重从高到低的下标顺序
+        min_weight: 候选周的最小权重
+
+    Returns:
+        候选周加权偏差之和的下界
+    """
+    cost = 0.0
+    for r, w in zip(residual, weights):
+        cost += w * abs(r)
+    for k in weight_order:
+        if remaining_qty <= 0:
+            break
+        if residual[k] < 0:
+            fill = min(-residual[k], remaining_qty)
+            cost -= weights[k] * fill
+            remaining_qty -= fill
+    if remaining_qty > 0:
+        cost += remaining_qty * min_weight
+    return cost
+
+
+def lower_bound(po_qty, candidate_weeks, target_weekly, weights):
+    """
+    计算一个SKU加权偏差的下界（连续松弛），用于评估任意解的最优性差距
+
+    Args:
+        po_qty: PO数量数组
+        candidate_weeks: 可分配的候选周索引数组
+        target_weekly: 每周目标数量（按周索引）
+        weights: 每周偏差权重（按周索引）
+
+    Returns:
+        加权偏差下界
+    """
+    target_weekly = np.asarray(target_weekly, dtype=float)
+    weights = np.asarray(weights, dtype=float)
+    is_candidate = np.zeros(len(target_weekly), dtype=bool)
+    is_candidate[candidate_weeks] = True
+
+    # 非候选周无法分配任何PO，偏差固定
+    fixed_cost = float(weights[~is_candidate] @ np.abs(target_weekly[~is_candidate]))
+    candidate_weights = weights[candidate_weeks].tolist()
+    residual = (-target_weekly[candidate_weeks]).tolist()
+    order = sorted(range(len(candidate_weights)), key=lambda k: -candidate_weights[k])
+    return fixed_cost + relaxation_bound(residual, candidate_weights, float(np.sum(po_qty)),
+                                         order, min(candidate_weights))
+
+
+class BranchAndBound:
+    """
+    PO到周分配的分支定界精确求解器
+
+    按数量从大到小依次为PO选择候选周（子节点按边际偏差从小到大展开），
+    用连续松弛下界剪枝；数量相同的PO按候选周顺序不减分配以消除对称解。
+    达到节点或时间上限时返回当前最优解及全局下界，不保证最优。
+    """
+
+    EPS = 1e-9
+
+    def __init__(self, po_qty, candidate_weeks, target_weekly, weights,
+                 initial_assignment=None, node_limit=200000, time_limit=None, should_stop=None):
+        """
+        初始化求解器
+
+        Args:
+            po_qty: PO数量数组
+            candidate_weeks: 可分配的候选周索引数组
+            target_weekly: 每周目标数量（按周索引）
+            weights: 每周偏差权重（按周索引）
+            initial_assignment: 初始可行解（周索引数组），作为初始上界
+            node_limit: 最多搜索的节点数
+            time_limit: 最长运行时间（秒），None表示不限制
+            should_stop: 无参数的回调，返回True时提前结束（用于取消任务），None表示不检查
+        """
+        self.po_qty = np.asarray(po_qty, dtype=float)
+        self.candidate_weeks = np.asarray(candidate_weeks, dtype=np.int64)
+        self.target_weekly = np.asarray(target_weekly, dtype=float)
+        self.weights = np.asarray(weights, dtype=float)
+        self.initial_assignment = initial_assignment
+        self.node_limit = node_limit
+        self.time_limit = time_limit
+        self.should_stop = should_stop
+        self.nodes = 0
+
+        is_candidate = np.zeros(len(self.target_weekly), dtype=bool)
+        is_candidate[self.candidate_weeks] = True
+        self.fixed_cost = float(self.weights[~is_candidate] @ np.abs(self.target_weekly[~is_candidate]))
+
+        self.cand_weights = self.weights[self.candidate_weeks].tolist()
+        self.weight_order = sorted(range(len(self.cand_weights)), key=lambda k: -self.cand_weights[k])
+        self.min_weight = min(self.cand_weights)
+
+        # 按数量从大到小分支：大PO先定位置，下界更快收紧
+        self.order = np.argsort(-self.po_qty, kind='stable')
+        self.sorted_qty = self.po_qty[self.order].tolist()
+        self.remaining = np.concatenate([np.cumsum(self.po_qty[self.order][::-1])[::-1], [0.0]]).tolist()
+
+    def _cost(self, assigned_weeks):
+        """完整目标函数值"""
+        load = np.bincount(assigned_weeks, weights=self.po_qty, minlength=len(self.target_weekly))
+        return float(self.weights @ np.abs(load - self.target_weekly))
+
+    def solve(self):
+        """
+        执行分支定界
+
+        Returns:
+            (最优分配的周索引数组, 目标值, 下界, 是否证明最优)
+        """
+        start = time.perf_counter()
+        n = len(self.sorted_qty)
+        m = len(self.cand_weights)
+        residual = (-self.target_weekly[self.candidate_weeks]).tolist()
+
+        root_bound = self.fixed_cost + relaxation_bound(residual, self.cand_weights, self.remaining[0],
+                                                        self.weight_order, self.min_weight)
+        if self.initial_assignment is not None:
+            best_assigned = np.asarray(self.initial_assignment, dtype=np.int64)
+            best_cost = self._cost(best_assigned)
+        else:
+            best_assigned, best_cost = None, float('inf')
+
+        week_of = [0] * n  # 按排序后PO顺序记录所选候选周的下标
+        self.nodes = 0
+        aborted = False
+
+        def branch(depth, cost):
+            nonlocal best_cost, best_assigned, aborted
+            if depth == n:
+                total = self.fixed_cost + cost
+                if total < best_cost - self.EPS:
+                    best_cost = total
+                    assigned = np.empty(n, dtype=np.int64)
+                    assigned[self.order] = self.candidate_weeks[week_of]
+                    best_assigned = assigned
+                return
+
+            self.nodes += 1
+            if self.nodes > self.node_limit or (self.nodes % 1000 == 0 and (
+                    (self.time_limit is not None and time.perf_counter() - start > self.time_limit)
+                    or (self.should_stop is not None and self.should_stop()))):
+                aborted = True
+                return
+
+            qty = self.sorted_qty[depth]
+            # 对称性消除：与上一个PO数量相同时，只尝试不早于其所选候选周的位置
+            first = week_of[depth - 1] if depth > 0 and self.sorted_qty[depth - 1] == qty else 0
+            children = []
+            for k in range(first, m):
+                r = residual[k]
+                children.append((self.cand_weights[k] * (abs(r + qty) - abs(r)), k))
+            children.sort()
+
+            for delta, k in children:
+                residual[k] += qty
+                bound = self.fixed_cost + relaxation_bound(residual, self.cand_weights, self.remaining[depth + 1],
+                                                           self.weight_order, self.min_weight)
+                if bound < best_cost - self.EPS:
+                    week_of[depth] = k
+                    branch(depth + 1, cost + delta)
+                residual[k] -= qty
+                if aborted:
+                    return
+
+        initial_cost = sum(w * abs(r) for w, r in zip(self.cand_weights, residual))
+        if n > 0:
+            branch(0, initial_cost)
+        elif best_assigned is None:
+            best_assigned, best_cost = np.empty(0, dtype=np.int64), self.fixed_cost + initial_cost
+
+        proven = not aborted
+        bound = best_cost if proven else min(root_bound, best_cost)
+        return best_assigned, best_cost, bound, proven
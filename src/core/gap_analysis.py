@@ -6,10 +6,19 @@
 
 import pandas as pd
 import numpy as np
+from copy import copy
 from datetime import datetime
 from openpyxl import Workbook
-from openpyxl.styles import PatternFill, Font, Alignment, Border, Side
+from openpyxl.styles import PatternFill, Font, Alignment, Border, Side, NamedStyle
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
+from openpyxl.worksheet.cell_range import CellRange
+
+from .weeks import week_key, week_label, week_key_index
+from .input_cache import load_schedule, load_po_list
 
 
 class GapAnalyzer:
@@ -20,22 +29,17 @@ class GapAnalyzer:
         初始化差异分析器
 
         Args:
-            schedule_file: 排程目标文件
-            po_original_file: 原始PO文件
-            po_optimized_file: 优化后PO文件
+            schedule_file: 排程目标（文件路径或DataFrame）
+            po_original_file: 原始PO（文件路径或DataFrame）
+            po_optimized_file: 优化后PO（文件路径或DataFrame）
         """
-        self.schedule_df = pd.read_excel(schedule_file)
-        self.po_original_df = pd.read_excel(po_original_file)
-        self.po_optimized_df = pd.read_excel(po_optimized_file)
-
-        # 标准化PO清单列名（适配新格式）
-        column_mapping = {
-            'SKU/Spart': 'SKU',
-            '发运行数量': '数量',
-            '要求交付日期': '修改要货日期'
-        }
-        self.po_original_df = self.po_original_df.rename(columns=column_mapping)
-        self.po_optimized_df = self.po_optimized_df.rename(columns=column_mapping)
+        # 加载并标准化输入（列名、日期类型、week_num），相同文件读取Parquet缓存
+        self.schedule_df = load_schedule(schedule_file)
+        self.po_original_df = load_po_list(po_original_file)
+        self.po_optimized_df = load_po_list(po_optimized_file)
+
+        # create_gap_table的计算结果（首次调用时计算）
+        self._gap_table = None
 
     def aggregate_po_by_date(self, po_df, date_column='修改要货日期'):
         """
@@ -57,75 +61,89 @@ class GapAnalyzer:
 
         return agg_df
 
+    @staticmethod
+    def _weekly_rows(df, qty_column):
+        """提取有效记录的 (SKU, week_num, 数量) 数组；SKU或周次为空的记录不参与汇总"""
+        valid = df['SKU'].notna().to_numpy() & df['week_num'].notna().to_numpy()
+        return (df['SKU'].to_numpy()[valid], df['week_num'].to_numpy()[valid],
+                df[qty_column].to_numpy(dtype=float)[valid])
+
     def create_gap_table(self):
         """
         创建差异汇总表（按周维度）
 
+        SKU×周次的排程目标、PO汇总和差异以稠密数组计算一次并缓存在实例上，
+        Excel导出、汇总统计和JSON序列化都读取同一份结果。
+
         Returns:
-            DataFrame: SKU×周次的差异表
-            dict: 包含各部分数据的字典
+            dict: gap/schedule/po（DataFrame）、对应的稠密数组（*_values）、
+                  skus、weeks、week_labels，SKU/周次 -> 行/列下标的映射，
+                  以及各列的绝对周序号（week_indices）和各SKU排程第一周的绝对周序号（schedule_start）
         """
+        if self._gap_table is not None:
+            return self._gap_table
+
         # 1. 为排程目标和PO数据添加week_num（如果不存在）
-        schedule_df = self.schedule_df.copy()
+        schedule_df = self.schedule_df
         if 'week_num' not in schedule_df.columns:
-            schedule_df['week_num'] = schedule_df['日期'].apply(
-                lambda x: x.isocalendar()[0] * 100 + x.isocalendar()[1]
-            )
-
-        # 2. 按SKU+week_num汇总排程目标
-        schedule_weekly = schedule_df.groupby(['SKU', 'week_num'])['计划产量'].sum().reset_index()
-        schedule_pivot = schedule_weekly.pivot_table(
-            index='SKU',
-            columns='week_num',
-            values='计划产量',
-            fill_value=0
-        )
-
-        # 3. 按SKU+week_num汇总PO数据
-        po_optimized_df = self.po_optimized_df.copy()
-        if 'week_num' not in po_optimized_df.columns:
-            po_optimized_df['日期'] = pd.to_datetime(po_optimized_df['修改要货日期'])
-            po_optimized_df['week_num'] = po_optimized_df['日期'].apply(
-                lambda x: x.isocalendar()[0] * 100 + x.isocalendar()[1]
-            )
-
-        po_weekly = po_optimized_df.groupby(['SKU', 'week_num'])['数量'].sum().reset_index()
-        po_pivot = po_weekly.pivot_table(
-            index='SKU',
-            columns='week_num',
-            values='数量',
-            fill_value=0
-        )
-
-        # 4. 确保两个表有相同的周次列
-        all_weeks = sorted(set(schedule_pivot.columns) | set(po_pivot.columns))
-
-        # 重建两个表，确保列一致
-        schedule_aligned = schedule_pivot.reindex(columns=all_weeks, fill_value=0)
-        po_aligned = po_pivot.reindex(columns=all_weeks, fill_value=0)
-
-        # 确保两个表有相同的SKU
-        all_skus = sorted(set(schedule_aligned.index) | set(po_aligned.index))
-        schedule_aligned = schedule_aligned.reindex(index=all_skus, fill_value=0)
-        po_aligned = po_aligned.reindex(index=all_skus, fill_value=0)
-
-        # 5. 计算差异 (排程目标 - PO汇总)
-        gap = schedule_aligned - po_aligned
-
-        # 6. 生成周次标签（格式：2025W50）
-        week_labels = []
-        for week_num in all_weeks:
-            year = int(week_num // 100)
-            week = int(week_num % 100)
-            week_labels.append(f"{year}W{week:02d}")
+            schedule_df = schedule_df.assign(week_num=week_key(schedule_df['日期']))
 
-        return {
-            'gap': gap,
-            'schedule': schedule_aligned,
-            'po': po_aligned,
+        po_optimized_df = self.po_optimized_df
+        if 'week_num' not in po_optimized_df.columns:
+            po_optimized_df = po_optimized_df.assign(week_num=week_key(po_optimized_df['修改要货日期']))
+
+        schedule_skus, schedule_weeks, schedule_qty = self._weekly_rows(schedule_df, '计划产量')
+        po_skus, po_weeks, po_qty = self._weekly_rows(po_optimized_df, '数量')
+
+        # 2. SKU和周次取两个表的并集（升序），建立 值 -> 下标 的映射
+        all_skus = sorted(set(schedule_skus) | set(po_skus))
+        all_weeks = sorted(set(schedule_weeks) | set(po_weeks))
+        sku_index = {sku: i for i, sku in enumerate(all_skus)}
+        week_index = {week: j for j, week in enumerate(all_weeks)}
+
+        # 3. 按SKU+week_num汇总到稠密矩阵
+        def accumulate(skus, weeks, qty):
+            rows = np.fromiter((sku_index[sku] for sku in skus), dtype=np.int64, count=len(skus))
+            cols = np.fromiter((week_index[week] for week in weeks), dtype=np.int64, count=len(weeks))
+            flat = np.bincount(rows * len(all_weeks) + cols, weights=qty,
+                               minlength=len(all_skus) * len(all_weeks))
+            return flat.reshape(len(all_skus), len(all_weeks))
+
+        schedule_values = accumulate(schedule_skus, schedule_weeks, schedule_qty)
+        po_values = accumulate(po_skus, po_weeks, po_qty)
+
+        # 4. 计算差异 (排程目标 - PO汇总)
+        gap_values = schedule_values - po_values
+
+        # 各SKU排程第一周（绝对周序号），用于按优化器的优先周计算加权差异；没有排程的SKU为int64最大值
+        schedule_start = np.full(len(all_skus), np.iinfo(np.int64).max)
+        if len(schedule_skus):
+            np.minimum.at(schedule_start,
+                          np.fromiter((sku_index[sku] for sku in schedule_skus), dtype=np.int64,
+                                      count=len(schedule_skus)),
+                          week_key_index(schedule_weeks))
+
+        # 5. 生成周次标签（格式：2025W50）
+        week_labels = [week_label(week_num) for week_num in all_weeks]
+
+        index = pd.Index(all_skus, name='SKU')
+        columns = pd.Index(all_weeks, name='week_num')
+        self._gap_table = {
+            'gap': pd.DataFrame(gap_values, index=index, columns=columns),
+            'schedule': pd.DataFrame(schedule_values, index=index, columns=columns),
+            'po': pd.DataFrame(po_values, index=index, columns=columns),
+            'gap_values': gap_values,
+            'schedule_values': schedule_values,
+            'po_values': po_values,
+            'skus': all_skus,
             'weeks': all_weeks,
-            'week_labels': week_labels
+            'week_labels': week_labels,
+            'sku_index': sku_index,
+            'week_index': week_index,
+            'week_indices': week_key_index(all_weeks),
+            'schedule_start': schedule_start
         }
+        return self._gap_table
 
     def calculate_top_gaps(self, gap_df, percentile=70):
         """
@@ -139,7 +157,7 @@ class GapAnalyzer:
             float: 阈值
         """
         # 获取所有差异的绝对值
-        abs_gaps = gap_df.abs().values.flatten()
+        abs_gaps = np.abs(np.asarray(gap_df, dtype=float)).ravel()
 
         # 去除0值
         abs_gaps = abs_gaps[abs_gaps > 0]
@@ -162,137 +180,72 @@ class GapAnalyzer:
         """
         # 生成差异数据（按周）
         data = self.create_gap_table()
-        gap_df = data['gap']
-        schedule_df = data['schedule']
-        po_df = data['po']
+        gap_values = data['gap_values']
+        schedule_values = data['schedule_values']
+        po_values = data['po_values']
         weeks = data['weeks']
         week_labels = data['week_labels']
 
         # 计算高亮阈值
-        threshold = self.calculate_top_gaps(gap_df, 100 - highlight_top_percent)
+        threshold = self.calculate_top_gaps(gap_values, 100 - highlight_top_percent)
+
+        # 创建只写工作簿：按行流式写出，内存占用与SKU数无关
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("差异分析")
+        for style in self._excel_styles():
+            wb.add_named_style(style)
 
-        # 创建工作簿
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "差异分析"
+        num_weeks = len(weeks)
+        gap_start_col = 2
+        schedule_start_col = gap_start_col + num_weeks
+        po_start_col = schedule_start_col + num_weeks
 
-        # 设置列宽
+        # 设置列宽（只写模式下须在写入数据前设置）
         ws.column_dimensions['A'].width = 15
+        for col in range(gap_start_col, po_start_col + num_weeks):
+            ws.column_dimensions[get_column_letter(col)].width = 10
+
+        # 冻结首行首列
+        ws.freeze_panes = 'B3'
+
+        def styled(value, style):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            return cell
 
-        # 定义样式
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_font = Font(bold=True, color="FFFFFF", size=11)
-        subheader_fill = PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid")
-        subheader_font = Font(bold=True, size=10)
-
-        highlight_fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-        normal_border = Border(
-            left=Side(style='thin', color='D0D0D0'),
-            right=Side(style='thin', color='D0D0D0'),
-            top=Side(style='thin', color='D0D0D0'),
-            bottom=Side(style='thin', color='D0D0D0')
-        )
-
-        # 写入数据
-        current_col = 1
-        current_row = 1
-
-        # 1. 写入第一行分类标题
-        ws.cell(row=1, column=1, value="SKU")
-        ws.cell(row=1, column=1).fill = header_fill
-        ws.cell(row=1, column=1).font = header_font
-        ws.cell(row=1, column=1).alignment = Alignment(horizontal='center', vertical='center')
-
-        current_col = 2
-
-        # GAP差异部分
-        gap_start_col = current_col
-        ws.cell(row=1, column=current_col, value="GAP差异")
-        ws.cell(row=1, column=current_col).fill = header_fill
-        ws.cell(row=1, column=current_col).font = header_font
-        ws.cell(row=1, column=current_col).alignment = Alignment(horizontal='center', vertical='center')
-        current_col += len(weeks)
-
-        # 排程目标部分
-        schedule_start_col = current_col
-        ws.cell(row=1, column=current_col, value="排程目标")
-        ws.cell(row=1, column=current_col).fill = header_fill
-        ws.cell(row=1, column=current_col).font = header_font
-        ws.cell(row=1, column=current_col).alignment = Alignment(horizontal='center', vertical='center')
-        current_col += len(weeks)
-
-        # PO汇总结果部分
-        po_start_col = current_col
-        ws.cell(row=1, column=current_col, value="PO汇总结果")
-        ws.cell(row=1, column=current_col).fill = header_fill
-        ws.cell(row=1, column=current_col).font = header_font
-        ws.cell(row=1, column=current_col).alignment = Alignment(horizontal='center', vertical='center')
+        # 1. 写入第一行分类标题（GAP差异、排程目标、PO汇总结果各占一个周次区间）
+        header_row = [styled("SKU", 'gap_header')]
+        for title in ("GAP差异", "排程目标", "PO汇总结果"):
+            header_row.append(styled(title, 'gap_header'))
+            header_row.extend(styled(None, 'gap_header') for _ in range(num_weeks - 1))
+        ws.append(header_row)
 
         # 合并分类标题单元格
-        ws.merge_cells(start_row=1, start_column=gap_start_col,
-                      end_row=1, end_column=gap_start_col + len(weeks) - 1)
-        ws.merge_cells(start_row=1, start_column=schedule_start_col,
-                      end_row=1, end_column=schedule_start_col + len(weeks) - 1)
-        ws.merge_cells(start_row=1, start_column=po_start_col,
-                      end_row=1, end_column=po_start_col + len(weeks) - 1)
-
-        # 2. 写入第二行周次标题
-        ws.cell(row=2, column=1, value="SKU")
-        ws.cell(row=2, column=1).fill = subheader_fill
-        ws.cell(row=2, column=1).font = subheader_font
-        ws.cell(row=2, column=1).alignment = Alignment(horizontal='center', vertical='center')
-
-        # 写入3遍周次标签（GAP、排程、PO）
-        for part_idx in range(3):
-            start_col = [gap_start_col, schedule_start_col, po_start_col][part_idx]
-            for week_idx, week_label in enumerate(week_labels):
-                col = start_col + week_idx
-                ws.cell(row=2, column=col, value=week_label)
-                ws.cell(row=2, column=col).fill = subheader_fill
-                ws.cell(row=2, column=col).font = subheader_font
-                ws.cell(row=2, column=col).alignment = Alignment(horizontal='center', vertical='center', text_rotation=45)
-                ws.column_dimensions[ws.cell(row=2, column=col).column_letter].width = 10
+        if num_weeks > 0:
+            for start_col in (gap_start_col, schedule_start_col, po_start_col):
+                ws.merged_cells.add(CellRange(min_col=start_col, min_row=1,
+                                              max_col=start_col + num_weeks - 1, max_row=1))
 
-        # 3. 写入数据行
-        for sku_idx, sku in enumerate(gap_df.index):
-            row = sku_idx + 3
-
-            # SKU列
-            ws.cell(row=row, column=1, value=sku)
-            ws.cell(row=row, column=1).alignment = Alignment(horizontal='left', vertical='center')
-            ws.cell(row=row, column=1).border = normal_border
-
-            # GAP差异数据
-            for week_idx, week_num in enumerate(weeks):
-                col = gap_start_col + week_idx
-                value = gap_df.loc[sku, week_num]
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-                cell.border = normal_border
-
-                # 高亮top30%差异
-                if abs(value) >= threshold and abs(value) > 0:
-                    cell.fill = highlight_fill
-                    cell.font = Font(bold=True)
-
-            # 排程目标数据
-            for week_idx, week_num in enumerate(weeks):
-                col = schedule_start_col + week_idx
-                value = schedule_df.loc[sku, week_num]
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-                cell.border = normal_border
-
-            # PO汇总结果数据
-            for week_idx, week_num in enumerate(weeks):
-                col = po_start_col + week_idx
-                value = po_df.loc[sku, week_num]
-                cell = ws.cell(row=row, column=col, value=float(value))
-                cell.alignment = Alignment(horizontal='right', vertical='center')
-                cell.border = normal_border
+        # 2. 写入第二行周次标题（GAP、排程、PO各一遍）
+        ws.append([styled("SKU", 'gap_subheader')] +
+                  [styled(label, 'gap_week_label') for label in week_labels * 3])
 
-        # 冻结首行首列
-        ws.freeze_panes = 'B3'
+        # 3. 写入数据行
+        values = np.hstack([gap_values, schedule_values, po_values]).astype(float)
+        for sku, row_values in zip(data['skus'], values.tolist()):
+            ws.append([styled(sku, 'gap_sku')] +
+                      [styled(value, 'gap_value') for value in row_values])
+
+        # 高亮top N%差异：阈值只计算一次，作为整个GAP区域的条件格式规则
+        if len(data['skus']) > 0 and num_weeks > 0 and not np.isnan(threshold):
+            first_cell = f"{get_column_letter(gap_start_col)}3"
+            gap_range = (f"{first_cell}:{get_column_letter(schedule_start_col - 1)}"
+                         f"{len(data['skus']) + 2}")
+            ws.conditional_formatting.add(gap_range, FormulaRule(
+                formula=[f"AND(ABS({first_cell})>={float(threshold)!r},{first_cell}<>0)"],
+                fill=PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid"),
+                font=Font(bold=True)
+            ))
 
         # 保存文件
         wb.save(output_path)
@@ -300,6 +253,31 @@ class GapAnalyzer:
 
         return output_path
 
+    @staticmethod
+    def _excel_styles():
+        """差异分析表使用的命名样式（每种样式在工作簿中只注册一次）"""
+        border_side = Side(style='thin', color='D0D0D0')
+        normal_border = Border(left=border_side, right=border_side, top=border_side, bottom=border_side)
+
+        return [
+            NamedStyle(name='gap_header',
+                       fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+                       font=Font(bold=True, color="FFFFFF", size=11),
+                       alignment=Alignment(horizontal='center', vertical='center')),
+            NamedStyle(name='gap_subheader',
+                       fill=PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid"),
+                       font=Font(bold=True, size=10),
+                       alignment=Alignment(horizontal='center', vertical='center')),
+            NamedStyle(name='gap_week_label',
+                       fill=PatternFill(start_color="B4C7E7", end_color="B4C7E7", fill_type="solid"),
+                       font=Font(bold=True, size=10),
+                       alignment=Alignment(horizontal='center', vertical='center', text_rotation=45)),
+            NamedStyle(name='gap_sku', font=copy(DEFAULT_FONT), border=normal_border,
+                       alignment=Alignment(horizontal='left', vertical='center')),
+            NamedStyle(name='gap_value', font=copy(DEFAULT_FONT), border=normal_border,
+                       alignment=Alignment(horizontal='right', vertical='center')),
+        ]
+
     def generate_summary_stats(self):
         """
         生成差异汇总统计
@@ -307,19 +285,19 @@ class GapAnalyzer:
         Returns:
             dict: 统计信息
         """
-        data = self.create_gap_table()
-        gap_df = data['gap']
+        gap = self.create_gap_table()['gap_values']
+        empty = gap.size == 0
 
         # 计算统计指标
-        total_gap = gap_df.sum().sum()
-        abs_total_gap = gap_df.abs().sum().sum()
-        max_gap = gap_df.max().max()
-        min_gap = gap_df.min().min()
-        avg_gap = gap_df.mean().mean()
+        total_gap = gap.sum()
+        abs_total_gap = np.abs(gap).sum()
+        max_gap = np.nan if empty else gap.max()
+        min_gap = np.nan if empty else gap.min()
+        avg_gap = np.nan if empty else gap.mean()
 
         # 正负差异统计
-        positive_gaps = gap_df[gap_df > 0].sum().sum()
-        negative_gaps = gap_df[gap_df < 0].sum().sum()
+        positive_gaps = gap[gap > 0].sum()
+        negative_gaps = gap[gap < 0].sum()
 
         return {
             'total_gap': float(total_gap),
@@ -329,8 +307,180 @@ class GapAnalyzer:
             'avg_gap': float(avg_gap),
             'positive_gaps': float(positive_gaps),
             'negative_gaps': float(negative_gaps),
-            'sku_count': len(gap_df),
-            'week_count': len(gap_df.columns)  # 改为周数统计
+            'sku_count': gap.shape[0],
+            'week_count': gap.shape[1]  # 改为周数统计
+        }
+
+    def weighted_gaps(self, priority_weeks=8, priority_weight=10.0):
+        """
+        各SKU的加权绝对差异（与优化器目标一致：排程第一周起的前priority_weeks周使用优先权重）
+
+        Args:
+            priority_weeks: 优先周数
+            priority_weight: 优先周的权重
+
+        Returns:
+            np.ndarray: 按skus顺序的加权差异
+        """
+        data = self.create_gap_table()
+        offset = data['week_indices'][np.newaxis, :] - data['schedule_start'][:, np.newaxis]
+        weights = np.where((offset >= 0) & (offset < priority_weeks), priority_weight, 1.0)
+        return (weights * np.abs(data['gap_values'])).sum(axis=1)
+
+    def to_matrix(self, priority_weeks=8, priority_weight=10.0, highlight_top_percent=30):
+        """
+        差异矩阵的分页视图（供Web接口按需读取）
+
+        Args:
+            priority_weeks: 优先周数（计算加权差异）
+            priority_weight: 优先周的权重
+            highlight_top_percent: 高亮阈值对应的top百分比（与Excel导出一致）
+
+        Returns:
+            GapMatrix
+        """
+        data = self.create_gap_table()
+        return GapMatrix(skus=[str(sku) for sku in data['skus']],
+                         week_labels=data['week_labels'],
+                         gap_values=data['gap_values'],
+                         schedule_values=data['schedule_values'],
+                         po_values=data['po_values'],
+                         weighted_gaps=self.weighted_gaps(priority_weeks, priority_weight),
+                         highlight_threshold=float(self.calculate_top_gaps(
+                             data['gap_values'], 100 - highlight_top_percent)))
+
+
+class GapMatrix:
+    """
+    差异矩阵的分页视图
+
+    保存SKU×周次的差异、排程目标、PO汇总和各SKU的加权差异，按排序、SKU筛选、
+    行分页和周次区间返回可见部分（按列组织的扁平数组），前端只加载可见行。
+    """
+
+    ARRAYS = ('gap_values', 'schedule_values', 'po_values', 'weighted_gaps')
+    SORT_KEYS = ('weighted', 'abs', 'gap', 'sku')
+    MAX_PAGE_SIZE = 500
+
+    def __init__(self, skus, week_labels, gap_values, schedule_values, po_values,
+                 weighted_gaps, highlight_threshold=0.0):
+        """
+        初始化差异矩阵
+
+        Args:
+            skus: SKU列表（行）
+            week_labels: 周次标签列表（列，如 2025W50）
+            gap_values: 差异矩阵（SKU×周次）
+            schedule_values: 排程目标矩阵
+            po_values: PO汇总矩阵
+            weighted_gaps: 各SKU的加权绝对差异
+            highlight_threshold: 高亮阈值（绝对差异不小于该值的单元格高亮）
+        """
+        self.skus = np.asarray(skus, dtype=str)
+        self.week_labels = np.asarray(week_labels, dtype=str)
+        self.gap_values = np.asarray(gap_values, dtype=float)
+        self.schedule_values = np.asarray(schedule_values, dtype=float)
+        self.po_values = np.asarray(po_values, dtype=float)
+        self.weighted_gaps = np.asarray(weighted_gaps, dtype=float)
+        self.highlight_threshold = float(highlight_threshold)
+        self._lower_skus = np.char.lower(self.skus)
+        self._orders = {}
+
+    def save(self, path):
+        """
+        保存为npz文件
+
+        Args:
+            path: 文件路径（.npz）
+        """
+        np.savez_compressed(path, skus=self.skus, week_labels=self.week_labels,
+                            highlight_threshold=self.highlight_threshold,
+                            **{name: getattr(self, name) for name in self.ARRAYS})
+
+    @classmethod
+    def load(cls, path) -> 'GapMatrix':
+        """
+        从npz文件加载
+
+        Args:
+            path: 文件路径
+
+        Returns:
+            GapMatrix
+        """
+        with np.load(path) as data:
+            return cls(skus=data['skus'], week_labels=data['week_labels'],
+                       highlight_threshold=float(data['highlight_threshold']),
+                       **{name: data[name] for name in cls.ARRAYS})
+
+    def _order(self, sort, descending):
+        """按排序键的行顺序（稳定排序，相同值保持SKU顺序），按参数缓存"""
+        key = (sort, descending)
+        if key not in self._orders:
+            if sort == 'sku':
+                order = np.argsort(self.skus, kind='stable')
+                order = order[::-1] if descending else order
+            else:
+                values = {'weighted': self.weighted_gaps,
+                          'abs': np.abs(self.gap_values).sum(axis=1),
+                          'gap': self.gap_values.sum(axis=1)}[sort]
+                order = np.argsort(-values if descending else values, kind='stable')
+            self._orders[key] = order
+        return self._orders[key]
+
+    @staticmethod
+    def _compact(values) -> list:
+        """数组转为列表：全部为整数时输出整数（JSON更短），否则保留两位小数"""
+        if np.all(np.isfinite(values)) and np.array_equal(values, np.round(values)):
+            return values.astype(np.int64).tolist()
+        return np.round(values, 2).tolist()
+
+    def page(self, offset=0, limit=100, week_start=0, week_end=None, sort='weighted',
+             descending=True, query=None) -> dict:
+        """
+        获取一页数据
+
+        Args:
+            offset: 起始行（排序和筛选之后）
+            limit: 行数（不超过MAX_PAGE_SIZE）
+            week_start: 起始周次列下标（含）
+            week_end: 结束周次列下标（不含），None表示到最后一周
+            sort: 排序键，weighted（加权差异）/ abs（绝对差异合计）/ gap（差异合计）/ sku
+            descending: 是否降序
+            query: SKU筛选（包含该字符串，不区分大小写），None表示不筛选
+
+        Returns:
+            dict: total（筛选后的行数）、offset、week_start、week_end、weeks、week_count、
+                  skus、weighted_gaps，以及按行展开的 gap / schedule / po 扁平数组（每行week_end-week_start个值）
+        """
+        if sort not in self.SORT_KEYS:
+            raise ValueError(f"未知的排序键: {sort}，可选: {', '.join(self.SORT_KEYS)}")
+
+        order = self._order(sort, descending)
+        if query:
+            matched = np.char.find(self._lower_skus[order], query.lower()) >= 0
+            order = order[matched]
+
+        week_count = len(self.week_labels)
+        week_end = week_count if week_end is None else min(max(week_end, 0), week_count)
+        week_start = min(max(week_start, 0), week_end)
+        offset = max(offset, 0)
+        rows = order[offset:offset + min(max(limit, 0), self.MAX_PAGE_SIZE)]
+        columns = slice(week_start, week_end)
+
+        return {
+            'total': len(order),
+            'offset': offset,
+            'week_start': week_start,
+            'week_end': week_end,
+            'weeks': self.week_labels[columns].tolist(),
+            'week_count': week_count,
+            'highlight_threshold': self.highlight_threshold,
+            'skus': self.skus[rows].tolist(),
+            'weighted_gaps': self._compact(self.weighted_gaps[rows]),
+            'gap': self._compact(self.gap_values[rows, columns].ravel()),
+            'schedule': self._compact(self.schedule_values[rows, columns].ravel()),
+            'po': self._compact(self.po_values[rows, columns].ravel())
         }
 
 
@@ -339,7 +489,7 @@ def main():
     import sys
 
     if len(sys.argv) < 4:
-        print("用法: python gap_analysis.py <schedule_file> <po_original> <po_optimized> [output]")
+        print("用法: python -m src.core.gap_analysis <schedule_file> <po_original> <po_optimized> [output]")
         return
 
     schedule_file = sys.argv[1]
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+数据读写模块 - 支持Excel/CSV/Parquet/Feather文件和DataFrame输入，
+Excel和CSV输入标准化后按文件内容哈希缓存为Parquet列式文件
+"""
+
+import os
+import hashlib
+import tempfile
+import pandas as pd
+
+from .data_transformer import ScheduleTransformer
+from .work_calendar import DEFAULT_CACHE_DIR
+
+try:
+    import pyarrow  # noqa: F401  Parquet读写依赖，未安装时不使用缓存
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 缓存格式版本：标准化逻辑变化时递增，使旧缓存失效
+CACHE_VERSION = 1
+
+# 需要解析的文本格式，标准化结果写入缓存；Parquet/Feather本身即为列式格式，直接读取
+CACHED_EXTENSIONS = {'.xlsx', '.xls', '.csv'}
+
+# 检测排程表格式时读取的样本行数（表头之外）
+SAMPLE_ROWS = 5
+
+# 标准化PO清单列名（适配新格式）
+PO_COLUMN_MAPPING = {
+    'SKU/Spart': 'SKU',
+    '发运行数量': '数量',
+    '要求交付日期': '修改要货日期'
+}
+
+
+def file_digest(path: str) -> str:
+    """
+    计算文件内容哈希
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        SHA-256哈希（前16位十六进制）
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()[:16]
+
+
+def _extension(path: str) -> str:
+    """文件扩展名（小写，含点）"""
+    return os.path.splitext(str(path))[1].lower()
+
+
+def read_table(path: str, nrows: int = None, usecols=None) -> pd.DataFrame:
+    """
+    按扩展名读取表格文件：.csv / .parquet / .feather(.arrow)，其余按Excel读取
+
+    Args:
+        path: 文件路径
+        nrows: 只读取前nrows行，None表示全部
+        usecols: 只读取的列名列表，None表示全部
+
+    Returns:
+        原始DataFrame
+    """
+    ext = _extension(path)
+    if ext == '.csv':
+        return pd.read_csv(path, nrows=nrows, usecols=usecols)
+    if ext in ('.parquet', '.feather', '.arrow'):
+        # 列式格式按列读取，行数在读取后截取
+        if ext == '.parquet':
+            df = pd.read_parquet(path, columns=usecols)
+        else:
+            df = pd.read_feather(path, columns=usecols)
+        return df if nrows is None else df.head(nrows)
+    return pd.read_excel(path, nrows=nrows, usecols=usecols)
+
+
+def write_table(df: pd.DataFrame, path: str):
+    """
+    按扩展名写入表格文件：.csv / .parquet / .feather(.arrow)，其余按Excel写入
+
+    Args:
+        df: 要写入的DataFrame
+        path: 文件路径
+    """
+    ext = _extension(path)
+    if ext == '.csv':
+        # 带BOM，Excel直接打开CSV时中文不乱码
+        df.to_csv(path, index=False, encoding='utf-8-sig')
+    elif ext == '.parquet':
+        df.to_parquet(path, index=False)
+    elif ext in ('.feather', '.arrow'):
+        df.reset_index(drop=True).to_feather(path)
+    else:
+        df.to_excel(path, index=False)
+
+
+def normalize_schedule(df: pd.DataFrame) -> pd.DataFrame:
+    """排程目标标准化：交叉表转为长表，统一列名、日期类型和week_num"""
+    schedule_df, _ = ScheduleTransformer.normalize(df)
+    return schedule_df
+
+
+def sniff_schedule(path: str) -> dict:
+    """
+    只读取表头和少量样本行，检测排程文件格式
+
+    Args:
+        path: 文件路径
+
+    Returns:
+        ScheduleTransformer.detect_schema的结果（format、columns_map等）
+    """
+    sample = read_table(path, nrows=SAMPLE_ROWS)
+    return ScheduleTransformer.detect_schema(sample.columns)
+
+
+def read_schedule(path: str, drop_zeros: bool = False):
+    """
+    读取排程文件：先按表头检测格式，再决定读取方式并标准化
+
+    无法识别的格式在读取整张表之前报错；长表只读取识别出的日期、SKU、产量列。
+
+    Args:
+        path: 文件路径
+        drop_zeros: 交叉表转换时是否去掉数量为0的记录
+
+    Returns:
+        tuple: (标准化的长表DataFrame, 格式检测结果)
+    """
+    schema = sniff_schedule(path)
+    if schema['format'] == 'unknown':
+        raise ValueError("无法识别的文件格式。请确保文件为交叉表或长表格式。")
+
+    usecols = list(schema['columns_map']) if schema['format'] == 'long_format' else None
+    df = read_table(path, usecols=usecols)
+    schedule_df, _ = ScheduleTransformer.normalize(df, drop_zeros=drop_zeros, schema=schema)
+    return schedule_df, schema
+
+
+def normalize_po_list(df: pd.DataFrame) -> pd.DataFrame:
+    """PO清单标准化：统一列名和日期类型"""
+    df = df.rename(columns=PO_COLUMN_MAPPING)
+    if '修改要货日期' in df.columns:
+        df['修改要货日期'] = pd.to_datetime(df['修改要货日期'])
+    return df
+
+
+def _cache_path(path: str, kind: str, cache_dir: str) -> str:
+    """输入文件对应的缓存文件路径"""
+    return os.path.join(cache_dir, f"{kind}_v{CACHE_VERSION}_{file_digest(path)}.parquet")
+
+
+def _store(df: pd.DataFrame, cache_file: str):
+    """
+    写入缓存文件（先写临时文件再替换，避免并发读到不完整文件）
+
+    临时文件名唯一，同一进程的多个线程同时写入同一缓存也不会互相覆盖
+    """
+    tmp_file = None
+    try:
+        cache_dir = os.path.dirname(cache_file)
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(dir=cache_dir, suffix='.tmp', delete=False) as f:
+            tmp_file = f.name
+        df.to_parquet(tmp_file, index=False)
+        os.replace(tmp_file, cache_file)
+    except Exception as e:
+        # 列类型混杂等无法转为Parquet的数据不缓存，不影响本次加载
+        print(f"警告: 输入缓存写入失败: {e}")
+        if tmp_file is not None and os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def _use_cache(path: str, cache_dir: str) -> bool:
+    """该文件是否使用列式缓存"""
+    return cache_dir is not None and HAS_PYARROW and _extension(path) in CACHED_EXTENSIONS
+
+
+def _load(source, kind: str, normalize, cache_dir: str, read=None) -> pd.DataFrame:
+    """
+    读取缓存的标准化数据，不存在时读取文件、标准化并写入缓存；DataFrame直接标准化
+
+    read为从文件路径读取并标准化的函数，None表示read_table后调用normalize
+    """
+    if isinstance(source, pd.DataFrame):
+        return normalize(source)
+
+    path = source
+    if read is None:
+        read = lambda file_path: normalize(read_table(file_path))
+    if not _use_cache(path, cache_dir):
+        return read(path)
+
+    cache_file = _cache_path(path, kind, cache_dir)
+    if os.path.exists(cache_file):
+        try:
+            return pd.read_parquet(cache_file)
+        except Exception:
+            pass  # 缓存损坏时重新读取文件
+
+    df = read(path)
+    _store(df, cache_file)
+    return df
+
+
+def _cache(df: pd.DataFrame, path: str, kind: str, normalize, cache_dir: str):
+    """为已写入path的数据直接生成缓存，之后加载该文件时无需再解析"""
+    if not _use_cache(path, cache_dir):
+        return
+    _store(normalize(df.copy()), _cache_path(path, kind, cache_dir))
+
+
+def load_schedule(source, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    加载排程目标（长表或交叉表），返回标准化的长表
+
+    Args:
+        source: 文件路径（Excel/CSV/Parquet/Feather）或DataFrame
+        cache_dir: 缓存目录，None表示不使用缓存
+
+    Returns:
+        包含 日期, SKU, 计划产量, week_num 列的DataFrame
+    """
+    return _load(source, 'schedule', normalize_schedule, cache_dir,
+                 read=lambda path: read_schedule(path)[0])
+
+
+def load_po_list(source, cache_dir: str = DEFAULT_CACHE_DIR) -> pd.DataFrame:
+    """
+    加载PO清单（原始或优化后），返回列名和日期类型标准化后的DataFrame
+
+    Args:
+        source: 文件路径（Excel/CSV/Parquet/Feather）或DataFrame
+        cache_dir: 缓存目录，None表示不使用缓存
+
+    Returns:
+        PO清单DataFrame
+    """
+    return _load(source, 'po', normalize_po_list, cache_dir)
+
+
+def cache_schedule(df: pd.DataFrame, path: str, cache_dir: str = DEFAULT_CACHE_DIR):
+    """
+    将已处理的排程目标登记为path文件的缓存
+
+    Args:
+        df: 排程目标DataFrame（交叉表或长表）
+        path: 对应的文件路径（文件须已存在）
+        cache_dir: 缓存目录
+    """
+    _cache(df, path, 'schedule', normalize_schedule, cache_dir)
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+大邻域搜索模块 - 模拟退火 + 破坏重建（ruin & recreate）
+"""
+
+import math
+import random
+import time
+import numpy as np
+
+
+class LNSSearch:
+    """
+    模拟退火 + 大邻域搜索
+
+    小邻域：随机relocate/swap，按模拟退火准则接受（允许暂时变差以跳出局部最优）；
+    大邻域：长时间没有找到更优解时，从加权过剩最严重的周中取出一批PO，
+    再按边际偏差逐个贪心插回（破坏重建）。
+
+    与LocalSearch相同，目标函数为每周加权绝对偏差之和，每次移动只有两周的
+    残差变化，因此代价按增量计算。全程记录找到的最优分配。
+    """
+
+    def __init__(self, po_qty, assigned_weeks, candidate_weeks, target_weekly, weights,
+                 seed=0, time_limit=2.0, max_iterations=200000,
+                 ruin_fraction=0.1, ruin_patience=1000, should_stop=None):
+        """
+        初始化搜索
+
+        Args:
+            po_qty: PO数量数组
+            assigned_weeks: 初始分配的周索引数组
+            candidate_weeks: 可分配的候选周索引数组
+            target_weekly: 每周目标数量（按周索引）
+            weights: 每周偏差权重（按周索引）
+            seed: 随机种子（任意可哈希值，None表示随机）；相同种子在按迭代次数结束时结果可复现，
+                被time_limit截断时取决于机器速度
+            time_limit: 最长运行时间（秒），None表示只受迭代次数限制
+            max_iterations: 最多迭代次数
+            ruin_fraction: 每次破坏重建取出的PO比例
+            ruin_patience: 连续多少次迭代最优解未改进时执行一次破坏重建
+            should_stop: 无参数的回调，返回True时提前结束（用于取消任务），None表示不检查
+        """
+        self.po_qty = [float(q) for q in po_qty]
+        self.assigned = [int(w) for w in assigned_weeks]
+        self.candidate_weeks = [int(w) for w in candidate_weeks]
+        self.weights = [float(w) for w in weights]
+        self.time_limit = time_limit
+        self.max_iterations = max_iterations
+        self.should_stop = should_stop
+        self.ruin_count = max(2, int(len(self.po_qty) * ruin_fraction))
+        self.ruin_patience = ruin_patience
+        self.rng = random.Random(seed)
+
+        # 残差 = 实际 - 目标（正值=过剩，负值=缺货）
+        load = np.bincount(np.asarray(self.assigned, dtype=np.int64), weights=np.asarray(self.po_qty),
+                           minlength=len(target_weekly))
+        self.residual = (load - np.asarray(target_weekly, dtype=float)).tolist()
+        self.cost = sum(w * abs(r) for w, r in zip(self.weights, self.residual))
+        self.iterations = 0
+
+    def _transfer_delta(self, a, b, qty):
+        """从a周向b周转移qty（可为负）后加权偏差的变化量"""
+        r_a = self.residual[a]
+        r_b = self.residual[b]
+        return (self.weights[a] * (abs(r_a - qty) - abs(r_a))
+                + self.weights[b] * (abs(r_b + qty) - abs(r_b)))
+
+    def _transfer(self, a, b, qty, delta):
+        """执行转移并更新残差与代价"""
+        self.residual[a] -= qty
+        self.residual[b] += qty
+        self.cost += delta
+
+    def _random_move(self, temperature):
+        """随机relocate或swap一次，按模拟退火准则决定是否接受"""
+        rng = self.rng
+        i = rng.randrange(len(self.po_qty))
+        a = self.assigned[i]
+
+        if rng.random() < 0.5 or len(self.po_qty) < 2:
+            b = rng.choice(self.candidate_weeks)
+            j = -1
+            qty = self.po_qty[i]
+        else:
+            j = rng.randrange(len(self.po_qty))
+            b = self.assigned[j]
+            qty = self.po_qty[i] - self.po_qty[j]
+        if a == b:
+            return
+
+        delta = self._transfer_delta(a, b, qty)
+        if delta <= 0 or rng.random() < math.exp(-delta / temperature):
+            self._transfer(a, b, qty, delta)
+            self.assigned[i] = b
+            if j >= 0:
+                self.assigned[j] = a
+
+    def _ruin_and_recreate(self):
+        """从加权过剩最大的周取出一批PO，再按边际偏差从大到小贪心插回"""
+        surplus = sorted(set(self.assigned),
+                         key=lambda w: -self.weights[w] * self.residual[w])
+        removed = []
+        for week in surplus:
+            members = [i for i, w in enumerate(self.assigned) if w == week]
+            self.rng.shuffle(members)
+            removed.extend(members[:self.ruin_count - len(removed)])
+            if len(removed) >= self.ruin_count:
+                break
+
+        for i in removed:
+            a = self.assigned[i]
+            delta = self.weights[a] * (abs(self.residual[a] - self.po_qty[i]) - abs(self.residual[a]))
+            self.residual[a] -= self.po_qty[i]
+            self.cost += delta
+
+        for i in sorted(removed, key=lambda i: -self.po_qty[i]):
+            qty = self.po_qty[i]
+            best_week, best_delta = None, math.inf
+            for b in self.candidate_weeks:
+                r_b = self.residual[b]
+                delta = self.weights[b] * (abs(r_b + qty) - abs(r_b))
+                if delta < best_delta:
+                    best_week, best_delta = b, delta
+            self.residual[best_week] += qty
+            self.cost += best_delta
+            self.assigned[i] = best_week
+
+    def _initial_temperature(self, samples=200):
+        """以随机relocate的平均代价变化量作为初始温度"""
+        deltas = []
+        for _ in range(samples):
+            i = self.rng.randrange(len(self.po_qty))
+            b = self.rng.choice(self.candidate_weeks)
+            if b != self.assigned[i]:
+                deltas.append(abs(self._transfer_delta(self.assigned[i], b, self.po_qty[i])))
+        return max(float(np.mean(deltas)) if deltas else 1.0, 1e-6)
+
+    def run(self):
+        """
+        执行搜索，直到达到时间或迭代上限
+
+        Returns:
+            (最优分配的周索引数组, 迭代次数, 是否因时间上限或should_stop结束)
+        """
+        best_assigned = list(self.assigned)
+        # 单个PO时局部搜索已穷举所有候选周，无需再搜索
+        if len(self.po_qty) < 2 or len(self.candidate_weeks) < 2:
+            return np.asarray(best_assigned, dtype=np.int64), 0, False
+
+        start = time.perf_counter()
+        best_cost = self.cost
+        start_temperature = self._initial_temperature()
+        end_temperature = start_temperature * 1e-3
+        temperature = start_temperature
+        since_improvement = 0
+        timed_out = False
+
+        while self.iterations < self.max_iterations:
+            # 每100次迭代检查一次时间，并按迭代进度做几何降温（降温与机器速度无关，同一种子轨迹可复现）
+            if self.iterations % 100 == 0:
+                if self.time_limit is not None and time.perf_counter() - start >= self.time_limit:
+                    timed_out = True
+                    break
+                if self.should_stop is not None and self.should_stop():
+                    timed_out = True
+                    break
+                progress = self.iterations / self.max_iterations
+                temperature = start_temperature * (end_temperature / start_temperature) ** progress
+
+            self.iterations += 1
+            if since_improvement >= self.ruin_patience:
+                self._ruin_and_recreate()
+                since_improvement = 0
+            else:
+                self._random_move(temperature)
+                since_improvement += 1
+
+            if self.cost < best_cost - 1e-9:
+                best_cost = self.cost
+                best_assigned = list(self.assigned)
+                since_improvement = 0
+
+        return np.asarray(best_assigned, dtype=np.int64), self.iterations, timed_out
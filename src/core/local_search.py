@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+局部搜索模块 - 基于relocate/swap邻域的最优改进局部搜索
+"""
+
+import heapq
+import time
+import numpy as np
+
+
+class WeekBuckets:
+    """
+    周 -> 该周PO索引（按数量排序）的索引结构
+
+    每周单独保存一个按数量升序的数量数组和对应的PO下标数组（两端各加一个-1哨兵，
+    二分查找的结果可直接取上下两侧的PO）：在某周中查找数量最接近给定值的PO是一次
+    二分查找；移动PO只改动源周和目标周的数组，代价与这两周的PO数成正比，与PO总数无关。
+    """
+
+    def __init__(self, po_qty, assigned_weeks, n_weeks):
+        """
+        初始化索引
+
+        Args:
+            po_qty: PO数量数组
+            assigned_weeks: 每个PO当前所在的周索引
+            n_weeks: 周索引总数（周索引取值范围为0..n_weeks-1）
+        """
+        self.po_qty = np.asarray(po_qty, dtype=float)
+        weeks = np.asarray(assigned_weeks, dtype=np.int64)
+        order = np.lexsort((self.po_qty, weeks))
+        bounds = np.searchsorted(weeks[order], np.arange(n_weeks + 1))
+        self.qty = [self.po_qty[order[lo:hi]] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        self._pos = [np.concatenate(([-1], order[lo:hi], [-1])) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+    def size(self, week) -> int:
+        """给定周内的PO数"""
+        return len(self.qty[week])
+
+    def week_members(self, week):
+        """给定周内的PO下标（按数量升序）"""
+        return self._pos[week][1:-1]
+
+    def members(self, weeks):
+        """
+        获取给定周内的全部PO
+
+        Args:
+            weeks: 周索引（可迭代）
+
+        Returns:
+            PO下标数组
+        """
+        parts = [self.week_members(week) for week in weeks]
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.int64)
+
+    def nearest(self, weeks, values):
+        """
+        在每个查询周内查找数量紧邻给定值（下方、上方）的两个PO
+
+        查询按周分组，每个周对该周的数量数组做一次二分查找。
+
+        Args:
+            weeks: 查询周索引数组
+            values: 查询数量数组（与weeks同形状）
+
+        Returns:
+            形状为(2, *weeks.shape)的PO下标数组，不存在时为-1
+        """
+        weeks, values = np.broadcast_arrays(np.asarray(weeks, dtype=np.int64), values)
+        flat_weeks, flat_values = weeks.ravel(), values.ravel()
+        result = np.full((2, len(flat_weeks)), -1, dtype=np.int64)
+
+        order = np.argsort(flat_weeks, kind='stable')
+        sorted_weeks = flat_weeks[order]
+        starts = np.flatnonzero(np.r_[True, sorted_weeks[1:] != sorted_weeks[:-1]])
+        for lo, hi in zip(starts, np.r_[starts[1:], len(order)]):
+            week = sorted_weeks[lo]
+            rows = order[lo:hi]
+            idx = self.qty[week].searchsorted(flat_values[rows])
+            result[0, rows] = self._pos[week][idx]
+            result[1, rows] = self._pos[week][idx + 1]
+        return result.reshape((2,) + weeks.shape)
+
+    def move(self, po, old_week, new_week):
+        """把PO从old_week移到new_week，保持两周各自有序（只改动这两周的数组）"""
+        qty = self.po_qty[po]
+        i = np.searchsorted(self.qty[old_week], qty)
+        while self._pos[old_week][i + 1] != po:
+            i += 1
+        self.qty[old_week] = np.delete(self.qty[old_week], i)
+        self._pos[old_week] = np.delete(self._pos[old_week], i + 1)
+
+        j = np.searchsorted(self.qty[new_week], qty, side='right')
+        self.qty[new_week] = np.insert(self.qty[new_week], j, qty)
+        self._pos[new_week] = np.insert(self._pos[new_week], j + 1, po)
+
+
+class LocalSearch:
+    """
+    最优改进局部搜索
+
+    邻域：
+        relocate: 把一个PO从当前周移动到另一个候选周
+        swap: 交换两个不同周的PO
+
+    移动的收益只取决于涉及的两周的当前残差（实际-目标），且对转移数量是凹函数，
+    最优转移量落在两周残差对应的拐点附近。借助WeekBuckets按数量二分，只需为
+    每个(源周, 目标周)保留最优relocate、为每对有PO的周保留最优swap
+    （遍历两周中PO较少的一周，在另一周中二分查找交换对象）。
+    这些候选放在一个按收益排序的优先队列中；执行一次移动后只有涉及这两周的
+    候选需要重新计算并入队，队列中的过期条目按周版本号惰性丢弃，
+    过期条目占多数时重建队列。
+    """
+
+    EPS = 1e-9
+    MIN_HEAP_REBUILD = 4096  # 队列长度超过该值且为上次重建后的两倍时清理过期条目
+
+    def __init__(self, po_qty, assigned_weeks, candidate_weeks, target_weekly, weights,
+                 max_iterations=10000, time_limit=None, should_stop=None, on_move=None):
+        """
+        初始化局部搜索
+
+        Args:
+            po_qty: PO数量数组
+            assigned_weeks: 初始分配的周索引数组
+            candidate_weeks: 可分配的候选周索引数组
+            target_weekly: 每周目标数量（按周索引）
+            weights: 每周偏差权重（按周索引）
+            max_iterations: 最多执行的移动次数
+            time_limit: 最长运行时间（秒），None表示不限制
+            should_stop: 无参数的回调，返回True时提前结束（用于取消任务），None表示不检查
+            on_move: 每次移动后的回调 on_move(移动次数, PO下标, 交换的PO下标（移动时为-1）, 源周, 目标周, 偏差改善)，
+                None表示不回调
+        """
+        self.po_qty = np.asarray(po_qty, dtype=float)
+        self.assigned = np.array(assigned_weeks, dtype=np.int64)
+        self.candidate_weeks = np.asarray(candidate_weeks, dtype=np.int64)
+        self.weights = np.asarray(weights, dtype=float)
+        self.max_iterations = max_iterations
+        self.time_limit = time_limit
+        self.should_stop = should_stop
+        self.on_move = on_move
+
+        # 残差 = 实际 - 目标（正值=过剩，负值=缺货）
+        load = np.bincount(self.assigned, weights=self.po_qty, minlength=len(target_weekly))
+        self.residual = load - np.asarray(target_weekly, dtype=float)
+        self.buckets = WeekBuckets(self.po_qty, self.assigned, len(target_weekly))
+        self.is_candidate = np.zeros(len(target_weekly), dtype=bool)
+        self.is_candidate[self.candidate_weeks] = True
+
+        # 每周的版本号，周状态变化后该周相关的队列条目全部过期
+        self.version = np.zeros(len(target_weekly), dtype=np.int64)
+        self.heap = []
+        self._rebuild_at = self.MIN_HEAP_REBUILD
+        self._seq = 0
+        self.iterations = 0
+
+    def _transfer_gain(self, from_weeks, to_weeks, qty):
+        """从from_weeks向to_weeks转移qty（可为负）带来的加权偏差下降量"""
+        r_from = self.residual[from_weeks]
+        r_to = self.residual[to_weeks]
+        return (self.weights[from_weeks] * (np.abs(r_from) - np.abs(r_from - qty))
+                + self.weights[to_weeks] * (np.abs(r_to) - np.abs(r_to + qty)))
+
+    def _push(self, gains, po_i, po_j, from_weeks, to_weeks):
+        """将正收益的移动压入优先队列"""
+        mask = gains > self.EPS
+        if not mask.any():
+            return
+        for gain, i, j, a, b in zip(gains[mask], po_i[mask], po_j[mask], from_weeks[mask], to_weeks[mask]):
+            self._seq += 1
+            heapq.heappush(self.heap, (-gain, self._seq, int(i), int(j), int(a), int(b),
+                                       self.version[a], self.version[b]))
+
+    def _enqueue_relocates(self, from_weeks, to_weeks):
+        """
+        为每个(源周, 目标周)计算最优relocate并入队
+
+        收益对移动数量是凹函数，拐点为源周残差和目标周缺口，只需检查拐点两侧的PO
+        """
+        keep = from_weeks != to_weeks
+        from_weeks, to_weeks = from_weeks[keep], to_weeks[keep]
+        if len(from_weeks) == 0:
+            return
+        candidates = self.buckets.nearest(np.tile(from_weeks, 2),
+                                          np.concatenate([self.residual[from_weeks], -self.residual[to_weeks]]))
+        candidates = np.concatenate(np.split(candidates, 2, axis=1))
+        gains = self._transfer_gain(from_weeks, to_weeks, self.po_qty[candidates])
+        gains[candidates < 0] = -np.inf
+        best = np.argmax(gains, axis=0)
+        cols = np.arange(len(from_weeks))
+        self._push(gains[best, cols], candidates[best, cols], np.full(len(cols), -1),
+                   from_weeks, to_weeks)
+
+    def _enqueue_swaps(self, pairs):
+        """
+        为每对周计算两周PO互换的最优swap并入队
+
+        净转移量为两者数量之差，同样只需检查拐点两侧的PO；每对周只遍历PO较少的一周，
+        在另一周中二分查找交换对象，每对周只入队收益最大的一个swap
+
+        Args:
+            pairs: [(周, 周)]，两周都须有PO且都是候选周
+        """
+        pos, to_weeks, group = [], [], []
+        for k, (a, b) in enumerate(pairs):
+            if self.buckets.size(a) > self.buckets.size(b):
+                a, b = b, a
+            members = self.buckets.week_members(a)
+            pos.append(members)
+            to_weeks.append(np.full(len(members), b, dtype=np.int64))
+            group.append(np.full(len(members), k, dtype=np.int64))
+        if not pos:
+            return
+        pos, to_weeks, group = np.concatenate(pos), np.concatenate(to_weeks), np.concatenate(group)
+        from_weeks = self.assigned[pos]
+        qty = self.po_qty[pos]
+        candidates = self.buckets.nearest(np.tile(to_weeks, 2),
+                                          np.concatenate([qty - self.residual[from_weeks], qty + self.residual[to_weeks]]))
+        candidates = np.concatenate(np.split(candidates, 2, axis=1))
+        gains = self._transfer_gain(from_weeks, to_weeks, qty - self.po_qty[candidates])
+        gains[candidates < 0] = -np.inf
+        best = np.argmax(gains, axis=0)
+        cols = np.arange(len(pos))
+        gains, partners = gains[best, cols], candidates[best, cols]
+
+        # 每对周只保留收益最大的swap
+        order = np.lexsort((-gains, group))
+        first = order[np.r_[True, group[order][1:] != group[order][:-1]]]
+        self._push(gains[first], pos[first], partners[first], from_weeks[first], to_weeks[first])
+
+    def _swap_partners(self, week):
+        """可与给定周互换PO的周：有PO的候选周（不含给定周本身）"""
+        if not self.is_candidate[week] or self.buckets.size(week) == 0:
+            return []
+        return [other for other in self.candidate_weeks
+                if other != week and self.buckets.size(other) > 0]
+
+    def _enqueue_weeks(self, weeks):
+        """重新计算并入队与给定周相关的全部候选移动"""
+        weeks = np.asarray(weeks, dtype=np.int64)
+        others = self.candidate_weeks
+
+        # relocate：给定周 <-> 任意候选周
+        from_weeks = np.concatenate([np.repeat(weeks, len(others)), np.tile(others, len(weeks))])
+        to_weeks = np.concatenate([np.tile(others, len(weeks)), np.repeat(weeks, len(others))])
+        self._enqueue_relocates(from_weeks, to_weeks)
+
+        # swap：给定周 <-> 其他有PO的候选周（同一对周只计算一次）
+        pairs = []
+        for k, week in enumerate(weeks):
+            pairs.extend((week, other) for other in self._swap_partners(week) if other not in weeks[:k])
+        self._enqueue_swaps(pairs)
+
+    def _rebuild_heap(self):
+        """丢弃队列中的过期条目并重建堆"""
+        self.heap = [entry for entry in self.heap
+                     if self.version[entry[4]] == entry[6] and self.version[entry[5]] == entry[7]]
+        heapq.heapify(self.heap)
+        self._rebuild_at = max(2 * len(self.heap), self.MIN_HEAP_REBUILD)
+
+    def _apply(self, i, j, a, b):
+        """执行移动并更新残差、周索引和版本号"""
+        if j < 0:
+            qty = self.po_qty[i]
+        else:
+            qty = self.po_qty[i] - self.po_qty[j]
+            self.assigned[j] = a
+            self.buckets.move(j, b, a)
+        self.assigned[i] = b
+        self.buckets.move(i, a, b)
+        self.residual[a] -= qty
+        self.residual[b] += qty
+        self.version[a] += 1
+        self.version[b] += 1
+
+    def run(self):
+        """
+        执行最优改进局部搜索，直到没有正收益移动或达到迭代/时间上限
+
+        Returns:
+            (分配的周索引数组, 执行的移动次数, 是否因时间上限或should_stop提前结束)
+        """
+        start = time.perf_counter()
+        if len(self.po_qty) == 0:
+            return self.assigned, 0, False
+
+        # 初始化：所有(源周, 目标周)的relocate + 所有(PO, 目标周)的swap
+        occupied = np.unique(self.assigned)
+        others = self.candidate_weeks
+        self._enqueue_relocates(np.repeat(occupied, len(others)), np.tile(others, len(occupied)))
+        self._enqueue_swaps([(a, b) for a in occupied for b in self._swap_partners(a) if b > a])
+
+        timed_out = False
+        while self.heap and self.iterations < self.max_iterations:
+            if self.time_limit is not None and time.perf_counter() - start > self.time_limit:
+                timed_out = True
+                break
+            if self.should_stop is not None and self.should_stop():
+                timed_out = True
+                break
+
+            neg_gain, _, i, j, a, b, version_a, version_b = heapq.heappop(self.heap)
+            if self.version[a] != version_a or self.version[b] != version_b:
+                continue  # 过期条目：涉及的周已变化，新的候选已重新入队
+
+            self._apply(i, j, a, b)
+            self.iterations += 1
+
+            if self.on_move is not None:
+                self.on_move(self.iterations, i, j, a, b, -neg_gain)
+
+            # 只有a、b两周的残差和PO构成发生变化，重新计算与这两周相关的候选
+            self._enqueue_weeks(np.array([a, b]))
+            if len(self.heap) > self._rebuild_at:
+                self._rebuild_heap()
+
+        return self.assigned, self.iterations, timed_out
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+优化流水线 - 输入只加载一次，优化结果在内存中直接用于可视化和差异分析
+"""
+
+import pandas as pd
+
+from .po_adjustment import POOptimizer
+from .visualization import POVisualizer
+from .gap_analysis import GapAnalyzer
+from .input_cache import load_schedule, load_po_list
+from .work_calendar import DEFAULT_CACHE_DIR
+
+
+class OptimizationPipeline:
+    """
+    PO优化流水线
+
+    持有标准化后的排程目标、原始PO清单和优化结果，可视化器和差异分析器
+    直接基于内存中的DataFrame构建，文件只作为最终产物写出。
+    """
+
+    def __init__(self, schedule_aim_file, po_lists_file, cache_dir: str = DEFAULT_CACHE_DIR,
+                 **optimizer_options):
+        """
+        加载输入并创建优化器
+
+        Args:
+            schedule_aim_file: 排程目标（文件路径或DataFrame）
+            po_lists_file: PO清单（文件路径或DataFrame）
+            cache_dir: 输入文件解析结果和日历编译结果的缓存目录，None表示不使用缓存
+            optimizer_options: 传给POOptimizer的其他参数（priority_weeks、calendar等）
+        """
+        self.cache_dir = cache_dir
+        self.schedule_aim = load_schedule(schedule_aim_file, cache_dir=cache_dir)
+        self.po_lists = load_po_list(po_lists_file, cache_dir=cache_dir)
+        self.optimizer = POOptimizer(self.schedule_aim, self.po_lists, cache_dir=cache_dir, **optimizer_options)
+        self.optimized_po = None
+        self._visualizer = None
+        self._gap_analyzer = None
+
+    def run(self, **optimize_options) -> pd.DataFrame:
+        """
+        执行优化
+
+        Args:
+            optimize_options: 传给POOptimizer.optimize的参数（max_workers、engine等）
+
+        Returns:
+            调整后的完整PO清单
+        """
+        self.optimized_po = self.optimizer.optimize(**optimize_options)
+        self._visualizer = None
+        self._gap_analyzer = None
+        return self.optimized_po
+
+    def _require_result(self):
+        """确认已执行优化"""
+        if self.optimized_po is None:
+            raise RuntimeError("尚未执行优化，请先调用run()")
+
+    @property
+    def visualizer(self) -> POVisualizer:
+        """基于内存数据的可视化器（首次访问时创建）"""
+        self._require_result()
+        if self._visualizer is None:
+            self._visualizer = POVisualizer(self.schedule_aim, self.po_lists, self.optimized_po)
+        return self._visualizer
+
+    @property
+    def gap_analyzer(self) -> GapAnalyzer:
+        """基于内存数据的差异分析器（首次访问时创建）"""
+        self._require_result()
+        if self._gap_analyzer is None:
+            self._gap_analyzer = GapAnalyzer(self.schedule_aim, self.po_lists, self.optimized_po)
+        return self._gap_analyzer
+
+    @property
+    def budget_exhausted_skus(self):
+        """达到时间预算的SKU列表"""
+        return self.optimizer.budget_exhausted_skus
+
+    def save_results(self, output_file: str):
+        """
+        保存优化结果
+
+        Args:
+            output_file: 输出文件路径，按扩展名选择格式
+        """
+        self._require_result()
+        self.optimizer.save_results(self.optimized_po, output_file)
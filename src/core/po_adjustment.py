@@ -7,58 +7,95 @@ PO清单分箱优化算法
 
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import List, Tuple, Dict
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import time
+import multiprocessing
+from typing import Tuple, Dict
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
 import warnings
 warnings.filterwarnings('ignore')
 
+from .local_search import LocalSearch
+from .lns import LNSSearch
+from .exact import BranchAndBound, lower_bound
+from .weeks import week_index, week_key, week_label
+from .input_cache import DEFAULT_CACHE_DIR, load_schedule, load_po_list, write_table
+from .work_calendar import PlanningCalendar
+
+
+class OptimizationCancelled(Exception):
+    """优化任务被取消（cancel_event已设置）"""
+
 
 class POOptimizer:
     """PO订单日期优化器"""
 
-    def __init__(self, schedule_aim_file: str, po_lists_file: str):
+    ENGINES = ('greedy', 'lns', 'exact')
+    CANCEL_POLL_INTERVAL = 0.1  # 并行模式下检查取消标志的间隔（秒）
+
+    def __init__(self, schedule_aim_file, po_lists_file,
+                 priority_weeks: int = 8, priority_weight: float = 10.0,
+                 max_iterations: int = 10000, local_search_time_limit: float = None,
+                 lns_time_limit: float = 2.0, lns_max_iterations: int = 200000,
+                 exact_size_limit: int = 400,
+                 exact_node_limit: int = 50000, calendar=None, cache_dir: str = DEFAULT_CACHE_DIR):
         """
         初始化优化器
 
         Args:
-            schedule_aim_file: 排程目标文件路径
-            po_lists_file: PO清单文件路径
+            schedule_aim_file: 排程目标（Excel/CSV/Parquet/Feather文件路径或DataFrame）
+            po_lists_file: PO清单（Excel/CSV/Parquet/Feather文件路径或DataFrame）
+            priority_weeks: 优先保障的前N周（默认8周=2个月）
+            priority_weight: 优先周的偏差权重（默认10）
+            max_iterations: 每个SKU局部优化最多执行的移动次数
+            local_search_time_limit: 每个SKU局部优化的最长时间（秒），None表示不限制
+            lns_time_limit: lns引擎未指定随机种子时每个SKU大邻域搜索的时间（秒）
+            lns_max_iterations: lns引擎每个SKU大邻域搜索的最多迭代次数
+            exact_size_limit: exact引擎精确求解的规模阈值（PO数×候选周数），超过则回退到启发式
+            exact_node_limit: exact引擎每个SKU最多搜索的分支定界节点数
+            calendar: 规划日历（PlanningCalendar对象或JSON配置文件路径），None表示使用默认规划期和节假日
+            cache_dir: 输入文件解析结果和日历编译结果的缓存目录，None表示不使用缓存
         """
-        self.schedule_aim = pd.read_excel(schedule_aim_file)
-        self.po_lists = pd.read_excel(po_lists_file)
-
-        # 标准化PO清单列名（适配新格式）
-        column_mapping = {
-            'SKU/Spart': 'SKU',
-            '发运行数量': '数量',
-            '要求交付日期': '修改要货日期'
-        }
-        self.po_lists = self.po_lists.rename(columns=column_mapping)
-
-        # 确保日期格式正确
-        self.schedule_aim['日期'] = pd.to_datetime(self.schedule_aim['日期'])
-        self.po_lists['修改要货日期'] = pd.to_datetime(self.po_lists['修改要货日期'])
-
-        # 为schedule_aim添加week_num列
-        self.schedule_aim['week_num'] = self.schedule_aim['日期'].apply(
-            lambda x: x.isocalendar()[0] * 100 + x.isocalendar()[1]
+        self.priority_weeks = priority_weeks
+        self.priority_weight = priority_weight
+        self.max_iterations = max_iterations
+        self.local_search_time_limit = local_search_time_limit
+        self.lns_time_limit = lns_time_limit
+        self.lns_max_iterations = lns_max_iterations
+        self.exact_size_limit = exact_size_limit
+        self.exact_node_limit = exact_node_limit
+
+        # 加载并标准化输入（列名、日期类型、week_num），相同文件读取Parquet缓存
+        self.schedule_aim = load_schedule(schedule_aim_file, cache_dir=cache_dir)
+        self.po_lists = load_po_list(po_lists_file, cache_dir=cache_dir)
+
+        # 规划日历：有效周一（排除节假日）已编译为升序的周序号/天序号数组
+        if calendar is None:
+            calendar = PlanningCalendar(cache_dir=cache_dir)
+        elif isinstance(calendar, str):
+            calendar = PlanningCalendar.load(calendar, cache_dir=cache_dir)
+        self.calendar = calendar
+        if len(calendar.monday_weeks) == 0:
+            raise ValueError(f"规划期 {calendar.start_date.date()} 至 {calendar.end_date.date()} 内没有可用的周一")
+        self.valid_mondays = calendar.valid_mondays
+        self.valid_monday_days = calendar.monday_days
+
+        # 规划期映射为连续的周索引（0..W-1），之后所有按周的计算都使用定长数组
+        schedule_weeks = week_index(self.schedule_aim['日期'])
+        monday_weeks = calendar.monday_weeks
+        self.week_offset = int(min(schedule_weeks.min(), monday_weeks.min()))
+        self.num_weeks = int(max(schedule_weeks.max(), monday_weeks.max())) - self.week_offset + 1
+
+        # 每个周索引对应的周一日期和week_num（YYYYWW格式）
+        self.week_mondays = pd.to_datetime(
+            (np.arange(self.num_weeks) + self.week_offset) * 7 - 3, unit='D'
         )
+        self.week_keys = week_key(self.week_mondays)
 
-        # 日期约束
-        self.min_date = datetime(2025, 10, 1)
-        self.max_date = datetime(2026, 6, 1)
-
-        # 生成所有有效的周一日期（排除节假日）
-        self.valid_mondays = self._generate_valid_mondays()
+        # 有效周一对应的周索引（升序）
+        self.valid_monday_weeks = monday_weeks - self.week_offset
 
-        # 为每个周一计算week_num
-        self.monday_to_week = {}
-        for monday in self.valid_mondays:
-            # 计算ISO周数 (YYYYWW格式)
-            year, week, _ = monday.isocalendar()
-            week_num = year * 100 + week
-            self.monday_to_week[monday] = week_num
+        # 按SKU预先划分排程目标，避免每个SKU都扫描一遍整张排程表
+        self.sku_targets = self._partition_schedule()
 
         print(f"数据加载完成:")
         print(f"  排程目标记录数: {len(self.schedule_aim)}")
@@ -66,365 +103,350 @@ class POOptimizer:
         print(f"  有效周一日期数: {len(self.valid_mondays)}")
         print(f"  日期范围: {self.valid_mondays[0]} 至 {self.valid_mondays[-1]}")
 
-    def _generate_valid_mondays(self) -> List[datetime]:
+    def _partition_schedule(self) -> Dict[str, Tuple[np.ndarray, pd.Timestamp, int]]:
         """
-        生成所有有效的周一日期（不包括节假日）
+        一次性按SKU汇总排程目标
 
         Returns:
-            有效周一日期列表
+            {SKU: (每周目标数组, 排程第一天, 排程第一周的周索引)}
         """
-        # 中国节假日（2025-2026年主要节假日）
-        holidays = set([
-            # 2025年节假日
-            datetime(2025, 1, 1),  # 元旦
-            datetime(2025, 1, 28), datetime(2025, 1, 29), datetime(2025, 1, 30),
-            datetime(2025, 1, 31), datetime(2025, 2, 1), datetime(2025, 2, 2),
-            datetime(2025, 2, 3), datetime(2025, 2, 4),  # 春节
-            datetime(2025, 4, 5), datetime(2025, 4, 6), datetime(2025, 4, 7),  # 清明节
-            datetime(2025, 5, 1), datetime(2025, 5, 2), datetime(2025, 5, 3),  # 劳动节
-            datetime(2025, 5, 31), datetime(2025, 6, 1), datetime(2025, 6, 2),  # 端午节
-            datetime(2025, 10, 1), datetime(2025, 10, 2), datetime(2025, 10, 3),
-            datetime(2025, 10, 4), datetime(2025, 10, 5), datetime(2025, 10, 6),
-            datetime(2025, 10, 7), datetime(2025, 10, 8),  # 国庆节+中秋节
-            # 2026年节假日
-            datetime(2026, 1, 1), datetime(2026, 1, 2), datetime(2026, 1, 3),  # 元旦
-            datetime(2026, 2, 16), datetime(2026, 2, 17), datetime(2026, 2, 18),
-            datetime(2026, 2, 19), datetime(2026, 2, 20), datetime(2026, 2, 21),
-            datetime(2026, 2, 22), datetime(2026, 2, 23),  # 春节
-            datetime(2026, 4, 5), datetime(2026, 4, 6), datetime(2026, 4, 7),  # 清明节
-            datetime(2026, 5, 1), datetime(2026, 5, 2), datetime(2026, 5, 3),  # 劳动节
-        ])
-
-        valid_mondays = []
-        current_date = self.min_date
-
-        # 找到第一个周一
-        while current_date.weekday() != 0:  # 0 = Monday
-            current_date += timedelta(days=1)
-
-        # 生成所有周一
-        while current_date <= self.max_date:
-            if current_date not in holidays:
-                valid_mondays.append(current_date)
-            current_date += timedelta(days=7)
-
-        return valid_mondays
-
-    def _calculate_weekly_deviation(self, po_assignments: Dict[datetime, int],
-                                   target_weekly: Dict[int, int],
-                                   priority_weeks: int = 8) -> float:
+        grouped = self.schedule_aim.groupby('SKU')
+        sku_codes = grouped.ngroup().to_numpy()
+        week_idx = week_index(self.schedule_aim['日期']) - self.week_offset
+        quantities = self.schedule_aim['计划产量'].to_numpy(dtype=float)
+
+        # 同一SKU同一周的多条排程记录累加；SKU为空的记录不参与
+        valid = sku_codes >= 0
+        targets = np.bincount(sku_codes[valid] * self.num_weeks + week_idx[valid], weights=quantities[valid],
+                              minlength=grouped.ngroups * self.num_weeks).reshape(grouped.ngroups, self.num_weeks)
+        first_dates = grouped['日期'].min()
+        first_weeks = week_index(first_dates) - self.week_offset
+
+        return {sku: (targets[k], first_dates.iloc[k], int(first_weeks[k]))
+                for k, sku in enumerate(first_dates.index)}
+
+    def _priority_weights(self, first_week: int) -> np.ndarray:
         """
-        计算每周数量的绝对偏差之和
+        生成每周的偏差权重：从该SKU排程第一周起的前priority_weeks周使用优先权重
 
         Args:
-            po_assignments: 日期到PO数量的映射
-            target_weekly: week_num到目标数量的映射
-            priority_weeks: 优先保障的前N周（默认8周=2个月）
+            first_week: 该SKU排程第一周的周索引
 
         Returns:
-            加权偏差总和
+            长度为num_weeks的权重数组
         """
-        # 按week_num汇总实际分配
-        actual_weekly = {}
-        for monday, qty in po_assignments.items():
-            week_num = self.monday_to_week[monday]
-            actual_weekly[week_num] = actual_weekly.get(week_num, 0) + qty
-
-        # 计算所有周的偏差
-        all_weeks = sorted(set(list(target_weekly.keys()) + list(actual_weekly.keys())))
-
-        total_deviation = 0.0
-        for i, week_num in enumerate(all_weeks):
-            target = target_weekly.get(week_num, 0)
-            actual = actual_weekly.get(week_num, 0)
-            deviation = abs(actual - target)
-
-            # 前priority_weeks周给予更高的权重
-            if i < priority_weeks:
-                weight = 10.0  # 前2个月权重为10
-            else:
-                weight = 1.0
+        weights = np.ones(self.num_weeks)
+        weights[first_week:first_week + self.priority_weeks] = self.priority_weight
+        return weights
 
-            total_deviation += weight * deviation
+    @staticmethod
+    def _calculate_weekly_deviation(weekly_load: np.ndarray, target_weekly: np.ndarray,
+                                   weights: np.ndarray) -> float:
+        """
+        计算每周数量的加权绝对偏差之和
 
-        return total_deviation
+        Args:
+            weekly_load: 每周已分配数量（按周索引）
+            target_weekly: 每周目标数量（按周索引）
+            weights: 每周偏差权重（按周索引）
 
-    def _optimize_sku(self, sku_data: Tuple[str, pd.DataFrame]) -> pd.DataFrame:
+        Returns:
+            加权偏差总和
         """
-        优化单个SKU的PO日期分配
+        return float(weights @ np.abs(weekly_load - target_weekly))
+
+    @staticmethod
+    def _remaining_time(limit: float = None, *deadlines: float) -> float:
+        """
+        计算可用时间：自身时长上限与各截止时间（time.time()时间戳）剩余时间的最小值
 
         Args:
-            sku_data: (SKU名称, 该SKU的PO数据)
+            limit: 时长上限（秒），None表示不限制
+            deadlines: 截止时间，None表示不限制
 
         Returns:
-            调整后的PO数据
+            可用秒数（不小于0），均不限制时返回None
+        """
+        now = time.time()
+        limits = [limit] + [deadline - now for deadline in deadlines if deadline is not None]
+        limits = [value for value in limits if value is not None]
+        return max(min(limits), 0.0) if limits else None
+
+    def _build_sku_task(self, sku: str, row_ids: np.ndarray, po_qty: np.ndarray,
+                        original_days: np.ndarray, deadline: float = None,
+                        sku_time_budget: float = None, engine: str = 'greedy',
+                        seed: int = None) -> Dict:
         """
-        sku, po_df = sku_data
+        构建单个SKU的优化任务：只包含该SKU的数组数据和参数，不引用DataFrame，
+        提交到工作进程时序列化开销与该SKU的PO数量成正比
 
-        # 获取该SKU的排程目标
-        sku_target = self.schedule_aim[self.schedule_aim['SKU'] == sku].copy()
+        Args:
+            sku: SKU名称
+            row_ids: 该SKU的PO在po_lists中的行号
+            po_qty: 该SKU的PO数量
+            original_days: 该SKU的PO原日期（天序号）
+            deadline: 整批优化的截止时间（time.time()时间戳），None表示不限制
+            sku_time_budget: 单个SKU的时间预算（秒），None表示不限制
+            engine: 优化引擎
+            seed: 随机种子（lns引擎使用），None表示随机
 
-        if len(sku_target) == 0:
+        Returns:
+            任务字典；SKU不在排程目标中或没有可用日期时返回None（保持原日期）
+        """
+        # 获取该SKU的排程目标（加载时已按SKU划分）
+        if sku not in self.sku_targets:
             print(f"警告: SKU {sku} 在排程目标中不存在，保持原日期")
-            return po_df
+            return None
 
-        # 获取该SKU排程目标的第一周日期（约束：调整后日期不能早于此日期）
-        first_schedule_date = sku_target['日期'].min()
+        # 排程第一天（约束：调整后日期不能早于此日期）
+        target_weekly, first_schedule_date, first_week = self.sku_targets[sku]
 
-        # 过滤有效周一：只保留大于等于排程第一周的日期
-        valid_mondays_for_sku = [d for d in self.valid_mondays if d >= first_schedule_date]
+        # 过滤有效周一：有效周一按日期升序，二分查找第一个不早于排程第一天的周一
+        first_day = np.datetime64(first_schedule_date, 'D').astype(np.int64)
+        candidate_weeks = self.valid_monday_weeks[np.searchsorted(self.valid_monday_days, first_day):]
 
-        if len(valid_mondays_for_sku) == 0:
+        if len(candidate_weeks) == 0:
             print(f"警告: SKU {sku} 没有可用的日期（所有日期都早于排程第一周 {first_schedule_date}），保持原日期")
-            return po_df
-
-        # 构建目标字典 {week_num: 目标数量}
-        target_weekly = dict(zip(sku_target['week_num'], sku_target['计划产量']))
-
-        # PO订单列表 [(索引, 数量, 原日期)]
-        po_orders = [(idx, row['数量'], row['修改要货日期'])
-                     for idx, row in po_df.iterrows()]
-
-        # 贪心算法：逐个分配PO订单
-        best_assignments = {}  # {PO索引: 最佳日期}
-
-        for po_idx, po_qty, original_date in po_orders:
-            best_date = None
-            best_score = float('inf')
-
-            # 尝试每个有效的周一日期（已过滤，只包含>=排程第一周的日期）
-            for monday in valid_mondays_for_sku:
-                # 临时分配当前PO到这个日期
-                temp_assignments = best_assignments.copy()
-
-                # 将临时分配转换为 {日期: 数量} 格式用于计算偏差
-                date_qty_map = {}
-                for assigned_idx, assigned_date in temp_assignments.items():
-                    assigned_qty = po_df.loc[assigned_idx, '数量']
-                    date_qty_map[assigned_date] = date_qty_map.get(assigned_date, 0) + assigned_qty
-
-                # 添加当前PO
-                date_qty_map[monday] = date_qty_map.get(monday, 0) + po_qty
-
-                # 计算偏差（主要目标）
-                deviation = self._calculate_weekly_deviation(date_qty_map, target_weekly)
-
-                # 计算与原日期的距离（次要目标）
-                date_distance = abs((monday - original_date).days) / 100.0  # 归一化到较小范围
-
-                # 组合得分：偏差为主，日期距离为辅
-                score = deviation + date_distance * 0.01
-
-                if score < best_score:
-                    best_score = score
-                    best_date = monday
-
-            # 记录最佳分配
-            best_assignments[po_idx] = best_date
-
-        # === 阶段2：局部优化（多轮迭代调整） ===
-        # 计算初始偏差
-        date_qty_map = {}
-        for po_idx, assigned_date in best_assignments.items():
-            po_qty = po_df.loc[po_idx, '数量']
-            date_qty_map[assigned_date] = date_qty_map.get(assigned_date, 0) + po_qty
-
-        initial_deviation = self._calculate_weekly_deviation(date_qty_map, target_weekly)
-
-        # 局部优化：尝试移动PO以减少总偏差
-        max_iterations = 10  # 最多迭代10轮
-        improved = True
-        iteration = 0
-
-        # 调试：显示初始GAP前3名
-        actual_weekly_init = {}
-        for monday, qty in date_qty_map.items():
-            week_num = self.monday_to_week[monday]
-            actual_weekly_init[week_num] = actual_weekly_init.get(week_num, 0) + qty
-
-        all_weeks_init = sorted(set(list(target_weekly.keys()) + list(actual_weekly_init.keys())))
-        gaps_init = []
-        for i, week_num in enumerate(all_weeks_init):
-            target = target_weekly.get(week_num, 0)
-            actual = actual_weekly_init.get(week_num, 0)
-            gap = target - actual
-            weight = 10.0 if i < 8 else 1.0
-            gaps_init.append((week_num, gap, weight))
-
-        gaps_init.sort(key=lambda x: abs(x[1]) * x[2], reverse=True)
-        print(f"  初始GAP Top3: {[(f'{w//100}W{w%100:02d}', g, wt*abs(g)) for w, g, wt in gaps_init[:3]]}")
-
-        while improved and iteration < max_iterations:
-            improved = False
-            iteration += 1
-
-            # 计算当前每周的GAP
-            actual_weekly = {}
-            for monday, qty in date_qty_map.items():
-                week_num = self.monday_to_week[monday]
-                actual_weekly[week_num] = actual_weekly.get(week_num, 0) + qty
-
-            # 计算GAP并按权重排序
-            all_weeks = sorted(set(list(target_weekly.keys()) + list(actual_weekly.keys())))
-            week_gaps = []
-            for i, week_num in enumerate(all_weeks):
-                target = target_weekly.get(week_num, 0)
-                actual = actual_weekly.get(week_num, 0)
-                gap = target - actual  # 正值=缺货，负值=过剩
-
-                # 计算权重
-                weight = 10.0 if i < 8 else 1.0
-
-                week_gaps.append((week_num, gap, weight, i))
-
-            # 按加权GAP绝对值排序，找到最需要调整的周
-            week_gaps.sort(key=lambda x: abs(x[1]) * x[2], reverse=True)
-
-            # 调试：显示当前迭代的Top GAP
-            print(f"  迭代{iteration}: Top GAP={week_gaps[0][0]//100}W{week_gaps[0][0]%100:02d} gap={week_gaps[0][1]} weight={week_gaps[0][2]}")
-
-            # 尝试从过剩周移动PO到缺货周
-            for deficit_week, deficit_gap, deficit_weight, deficit_idx in week_gaps:
-                if deficit_gap <= 0:  # 跳过不缺货的周
-                    continue
-
-                # 找到这一周对应的所有周一日期
-                deficit_mondays = [m for m in valid_mondays_for_sku if self.monday_to_week[m] == deficit_week]
-                if not deficit_mondays:
-                    continue
-                deficit_monday = deficit_mondays[0]  # 取第一个周一
-
-                # 找到过剩最多的周
-                for surplus_week, surplus_gap, surplus_weight, surplus_idx in week_gaps:
-                    if surplus_gap >= 0:  # 跳过不过剩的周
-                        continue
-
-                    # 找到这一周分配的所有PO
-                    surplus_mondays = [m for m in valid_mondays_for_sku if self.monday_to_week[m] == surplus_week]
-                    if not surplus_mondays:
-                        continue
-
-                    surplus_pos = [(po_idx, po_qty) for po_idx, assigned_date in best_assignments.items()
-                                   if self.monday_to_week[assigned_date] == surplus_week
-                                   for po_qty in [po_df.loc[po_idx, '数量']]]
-
-                    if not surplus_pos:
-                        continue
-
-                    # 尝试移动一个或多个PO
-                    current_deviation = self._calculate_weekly_deviation(date_qty_map, target_weekly)
-
-                    for po_idx, po_qty in surplus_pos:
-                        # 尝试移动这个PO
-                        old_date = best_assignments[po_idx]
-
-                        # 计算移动后的新偏差
-                        new_date_qty_map = date_qty_map.copy()
-                        new_date_qty_map[old_date] -= po_qty
-                        if new_date_qty_map[old_date] == 0:
-                            del new_date_qty_map[old_date]
-                        new_date_qty_map[deficit_monday] = new_date_qty_map.get(deficit_monday, 0) + po_qty
-
-                        new_deviation = self._calculate_weekly_deviation(new_date_qty_map, target_weekly)
-
-                        # 如果改进了，就接受这个移动（即使改进很小也接受）
-                        if new_deviation < current_deviation:
-                            improvement = current_deviation - new_deviation
-                            old_week_num = self.monday_to_week[old_date]
-                            print(f"    移动PO {po_idx}(数量{po_qty}): {old_week_num//100}W{old_week_num%100:02d} -> {deficit_week//100}W{deficit_week%100:02d}, 偏差改善{improvement:.2f}")
-                            best_assignments[po_idx] = deficit_monday
-                            date_qty_map = new_date_qty_map
-                            improved = True
-                            break
-
-                    if improved:
-                        break
-
-                if improved:
-                    break
-
-        # 计算最终偏差
-        final_assignments = {}
-        for po_idx, best_date in best_assignments.items():
-            po_qty = po_df.loc[po_idx, '数量']
-            final_assignments[best_date] = final_assignments.get(best_date, 0) + po_qty
-
-        final_deviation = self._calculate_weekly_deviation(final_assignments, target_weekly)
+            return None
+
+        return {
+            'sku': sku,
+            'row_ids': row_ids,
+            'po_qty': po_qty,
+            'original_days': original_days,
+            'candidate_weeks': candidate_weeks,
+            'candidate_days': self.week_mondays[candidate_weeks].to_numpy(dtype='datetime64[D]').astype(np.int64),
+            'target_weekly': target_weekly,
+            'weights': self._priority_weights(first_week),
+            'week_keys': self.week_keys,
+            'engine': engine,
+            'seed': seed,
+            'deadline': deadline,
+            'sku_time_budget': sku_time_budget,
+            'max_iterations': self.max_iterations,
+            'local_search_time_limit': self.local_search_time_limit,
+            'lns_time_limit': self.lns_time_limit,
+            'lns_max_iterations': self.lns_max_iterations,
+            'exact_size_limit': self.exact_size_limit,
+            'exact_node_limit': self.exact_node_limit,
+        }
 
-        # 输出优化效果
-        if iteration > 0:
-            improvement = initial_deviation - final_deviation
-            improvement_pct = (improvement / initial_deviation * 100) if initial_deviation > 0 else 0
-            print(f"SKU {sku}: 优化完成, {len(po_orders)}个PO订单, 初始偏差={initial_deviation:.2f}, "
-                  f"局部优化{iteration}轮后偏差={final_deviation:.2f}, 改善{improvement:.2f}({improvement_pct:.1f}%)")
-        else:
-            print(f"SKU {sku}: 优化完成, {len(po_orders)}个PO订单, 加权偏差={final_deviation:.2f}")
+    @staticmethod
+    def _greedy_assign(po_qty: np.ndarray, original_days: np.ndarray,
+                       candidate_weeks: np.ndarray, candidate_days: np.ndarray,
+                       target_weekly: np.ndarray, weights: np.ndarray) -> np.ndarray:
+        """
+        贪心分配：按顺序为每个PO选择边际加权偏差最小的候选周
 
-        # 更新PO数据
-        result_df = po_df.copy()
-        for po_idx, best_date in best_assignments.items():
-            result_df.loc[po_idx, '修改要货日期'] = best_date
-            result_df.loc[po_idx, 'week_num'] = self.monday_to_week[best_date]
+        每个PO对所有候选周的打分是一次向量运算：只有被选中的那一周偏差发生变化，
+        因此得分 = 该周偏差增量 + 日期距离（次要目标，预先计算）。
 
-        return result_df
+        Args:
+            po_qty: PO数量
+            original_days: PO原日期（天序号）
+            candidate_weeks: 候选周索引
+            candidate_days: 候选周一日期（天序号）
+            target_weekly: 每周目标数量（按周索引）
+            weights: 每周偏差权重（按周索引）
 
-    def optimize(self, max_workers: int = None) -> pd.DataFrame:
+        Returns:
+            每个PO分配到的周索引
+        """
+        candidate_target = target_weekly[candidate_weeks]
+        candidate_weight = weights[candidate_weeks]
+        candidate_load = np.zeros(len(candidate_weeks))
+
+        # 与原日期的距离（次要目标），归一化到较小范围
+        date_distance = np.abs(candidate_days[None, :] - original_days[:, None]) / 100.0 * 0.01
+
+        assigned = np.empty(len(po_qty), dtype=np.int64)
+        for i, qty in enumerate(po_qty):
+            current_gap = np.abs(candidate_load - candidate_target)
+            score = candidate_weight * (np.abs(candidate_load + qty - candidate_target) - current_gap)
+            best = int(np.argmin(score + date_distance[i]))
+            candidate_load[best] += qty
+            assigned[i] = best
+
+        return candidate_weeks[assigned]
+
+    def optimize(self, max_workers: int = None, time_budget: float = None,
+                 sku_time_budget: float = None, engine: str = 'greedy', seed: int = None,
+                 on_event=None, cancel_event=None, executor=None) -> pd.DataFrame:
         """
         并行优化所有SKU的PO日期
 
+        预算用完时不会中断：已开始的SKU返回当前最优分配，尚未开始的SKU保持原日期。
+        各SKU的优化报告（含下界与最优性差距）保存在self.sku_reports，
+        达到预算的SKU列表保存在self.budget_exhausted_skus。
+
         Args:
-            max_workers: 最大并行工作进程数
+            max_workers: 最大并行工作进程数（使用共享进程池时为同时提交的SKU数上限）
+            time_budget: 整批优化的时间预算（秒），None表示不限制
+            sku_time_budget: 单个SKU的时间预算（秒），None表示不限制
+            engine: 优化引擎，'greedy'（贪心+局部搜索）、'lns'（再加模拟退火大邻域搜索）
+                或'exact'（小规模SKU分支定界求最优，超过规模阈值回退到greedy）
+            seed: 随机种子（lns引擎使用）。指定种子时大邻域搜索只按迭代次数结束、不受lns_time_limit限制，
+                相同种子结果可复现（time_budget/sku_time_budget提前截断时除外）；
+                None表示使用随机种子，并按lns_time_limit限时
+            on_event: 进度事件回调 on_event(event)，event为带'type'键的字典（见log_event）；
+                None表示用log_event输出到控制台。传入回调时单进程模式还会发出局部搜索的逐次移动事件
+            cancel_event: 取消标志（threading.Event），设置后在SKU之间及搜索循环内尽快停止，
+                并抛出OptimizationCancelled；并行模式下取消排队中的SKU，并通过跨进程标志
+                通知工作进程中正在优化的SKU停止
+            executor: 共享的进程池（如WorkerPool，提供create_event时用它创建跨进程取消标志），
+                None表示本次优化临时创建进程池
 
         Returns:
             调整后的完整PO清单
         """
-        print(f"\n开始优化所有SKU的PO日期...")
-        print(f"=" * 60)
-
-        # 按SKU分组
-        sku_groups = [(sku, group.copy()) for sku, group in self.po_lists.groupby('SKU')]
-
-        print(f"共有 {len(sku_groups)} 个SKU需要优化\n")
-
-        # 并行处理每个SKU
-        optimized_results = []
-
-        if max_workers == 1 or len(sku_groups) == 1:
-            # 单进程处理（方便调试）
-            for sku_data in sku_groups:
+        if engine not in self.ENGINES:
+            raise ValueError(f"未知的优化引擎: {engine}，可选: {', '.join(self.ENGINES)}")
+
+        emit = on_event if on_event is not None else log_event
+        deadline = time.time() + time_budget if time_budget is not None else None
+        self.sku_reports = {}
+
+        # 按SKU分组：每个SKU只取行号，数量和原日期（天序号）一次性转为数组后按行号切片
+        sku_rows = self.po_lists.groupby('SKU').indices
+        all_qty = self.po_lists['数量'].to_numpy(dtype=float)
+        all_days = self.po_lists['修改要货日期'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+        emit({'type': 'optimize_started', 'total': len(sku_rows), 'engine': engine})
+
+        tasks = []
+        results = {}
+        for sku, row_ids in sku_rows.items():
+            task = self._build_sku_task(sku, row_ids, all_qty[row_ids], all_days[row_ids],
+                                        deadline, sku_time_budget, engine, seed)
+            if task is None:
+                results[sku] = {'sku': sku, 'row_ids': row_ids, 'weeks': None,
+                                'report': _new_report(sku, engine, len(row_ids), status='skipped')}
+            else:
+                tasks.append(task)
+
+        total = len(sku_rows)
+        done = len(results)
+        should_stop = cancel_event.is_set if cancel_event is not None else None
+
+        def check_cancelled():
+            if should_stop is not None and should_stop():
+                raise OptimizationCancelled(f"优化已取消（已完成 {done}/{total} 个SKU）")
+
+        def finish(sku, result=None, error=None):
+            """记录一个SKU的结果并发出完成（或失败）事件"""
+            nonlocal done
+            done += 1
+            if result is None:
+                emit({'type': 'sku_failed', 'sku': sku, 'error': error, 'done': done, 'total': total})
+                return
+            results[sku] = result
+            # 进程池中执行的SKU在子进程内缓存事件，完成后按顺序转发
+            for event in result.pop('events', None) or []:
+                emit(event)
+            emit(_sku_finished_event(result['report'], done, total))
+
+        if max_workers == 1 or len(tasks) <= 1:
+            # 单进程处理（方便调试）：取消标志同时传入搜索循环，事件直接发出
+            for task in tasks:
+                check_cancelled()
+                # 逐次移动事件只在单进程且有外部订阅者时产生，控制台输出不逐次打印
+                task['trace_moves'] = on_event is not None
                 try:
-                    result = self._optimize_sku(sku_data)
-                    optimized_results.append(result)
+                    result = _solve_sku_task(task, should_stop=should_stop, on_event=emit)
                 except Exception as e:
-                    sku = sku_data[0]
-                    print(f"错误: SKU {sku} 优化失败: {str(e)}")
+                    finish(task['sku'], error=str(e))
                     import traceback
                     traceback.print_exc()
+                else:
+                    finish(task['sku'], result)
+            check_cancelled()
         else:
-            # 多进程并行处理
-            with ProcessPoolExecutor(max_workers=max_workers) as executor:
-                futures = {executor.submit(self._optimize_sku, sku_data): sku_data[0]
-                          for sku_data in sku_groups}
-
-                for future in as_completed(futures):
-                    try:
-                        result = future.result()
-                        optimized_results.append(result)
-                    except Exception as e:
-                        sku = futures[future]
-                        print(f"错误: SKU {sku} 优化失败: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
+            # 多进程并行处理：提交模块级函数，避免序列化整个优化器；子进程只回传SKU级事件，不产生逐次移动事件
+            # 同时在途的SKU不超过max_workers个，完成一个再提交下一个；共享进程池时不占满其他任务的进程
+            owned = executor is None
+            if owned:
+                executor = ProcessPoolExecutor(max_workers=max_workers)
+            # 跨进程取消标志：随任务传给工作进程，在搜索循环内检查；共享进程池提供常驻的Manager
+            manager = None
+            cancel_flag = None
+            if should_stop is not None:
+                if hasattr(executor, 'create_event'):
+                    cancel_flag = executor.create_event()
+                else:
+                    manager = multiprocessing.get_context('spawn').Manager()
+                    cancel_flag = manager.Event()
+            pending_tasks = iter(tasks)
+            futures = {}
+
+            def submit_next():
+                task = next(pending_tasks, None)
+                if task is not None:
+                    task['cancel_flag'] = cancel_flag
+                    futures[executor.submit(_solve_sku_task, task)] = task['sku']
+
+            try:
+                for _ in range(max_workers or len(tasks)):
+                    submit_next()
+
+                while futures:
+                    # 带超时等待，SKU运行期间也能及时发现取消
+                    finished, _ = wait(futures, timeout=self.CANCEL_POLL_INTERVAL, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        sku = futures.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            finish(sku, error=str(e))
+                            import traceback
+                            traceback.print_exc()
+                        else:
+                            finish(result['sku'], result)
+                    if should_stop is not None and should_stop():
+                        # 不再提交新的SKU，取消尚未开始的SKU，通知正在运行的SKU在搜索循环内停止
+                        cancel_flag.set()
+                        for pending in futures:
+                            pending.cancel()
+                        break
+                    for _ in finished:
+                        submit_next()
+            finally:
+                if owned:
+                    executor.shutdown(wait=True, cancel_futures=True)
+                if manager is not None:
+                    manager.shutdown()
+            check_cancelled()
 
         # 检查是否有成功的结果
-        if len(optimized_results) == 0:
-            raise ValueError(f"所有{len(sku_groups)}个SKU的优化都失败了，无法生成结果。请检查数据格式和日志输出。")
-
-        # 合并所有结果
-        final_po_lists = pd.concat(optimized_results, ignore_index=True)
-
-        print(f"\n" + "=" * 60)
-        print(f"优化完成！总共处理 {len(final_po_lists)} 条PO记录")
+        if len(results) == 0:
+            raise ValueError(f"所有{len(sku_rows)}个SKU的优化都失败了，无法生成结果。请检查数据格式和日志输出。")
+
+        # 按(行号, 周索引)一次性写回结果，未优化的SKU保持原日期；结果按SKU顺序排列，失败的SKU不输出
+        ordered = [results[sku] for sku in sku_rows if sku in results]
+        for result in ordered:
+            self.sku_reports[result['sku']] = result['report']
+        assigned = [result for result in ordered if result['weeks'] is not None]
+        new_dates = self.po_lists['修改要货日期'].to_numpy(copy=True)
+        week_num = np.full(len(self.po_lists), np.nan)
+        if assigned:
+            row_ids = np.concatenate([result['row_ids'] for result in assigned])
+            weeks = np.concatenate([result['weeks'] for result in assigned])
+            new_dates[row_ids] = self.week_mondays[weeks].to_numpy()
+            week_num[row_ids] = self.week_keys[weeks]
+
+        final_po_lists = self.po_lists.copy()
+        final_po_lists['修改要货日期'] = new_dates
+        final_po_lists['week_num'] = week_num if np.isnan(week_num).any() else week_num.astype(np.int64)
+        order = np.concatenate([result['row_ids'] for result in ordered])
+        final_po_lists = final_po_lists.iloc[order].reset_index(drop=True)
+
+        self.budget_exhausted_skus = [sku for sku, report in self.sku_reports.items()
+                                      if report['budget_exhausted']]
+
+        solved = [report for report in self.sku_reports.values() if report['gap'] is not None]
+        emit({'type': 'optimize_finished', 'po_count': len(final_po_lists),
+              'budget_exhausted_skus': list(self.budget_exhausted_skus),
+              'solved': len(solved), 'proven': int(sum(report['proven_optimal'] for report in solved)),
+              'total_gap': float(sum(report['gap'] for report in solved))})
 
         return final_po_lists
 
@@ -434,25 +456,245 @@ class POOptimizer:
 
         Args:
             optimized_po: 优化后的PO清单
-            output_file: 输出文件路径
+            output_file: 输出文件路径，按扩展名保存为Excel（.xlsx）、CSV（.csv）、Parquet（.parquet）或Feather（.feather）
         """
-        optimized_po.to_excel(output_file, index=False)
+        write_table(optimized_po, output_file)
         print(f"\n结果已保存至: {output_file}")
 
 
+def _new_report(sku: str, engine: str, po_count: int, status: str = 'optimized') -> Dict:
+    """生成单个SKU的初始优化报告"""
+    return {'sku': sku, 'engine': engine, 'po_count': po_count, 'status': status,
+            'budget_exhausted': False,
+            'initial_deviation': None, 'final_deviation': None, 'iterations': 0,
+            'lower_bound': None, 'gap': None, 'proven_optimal': False}
+
+
+def _sku_finished_event(report: Dict, done: int, total: int) -> Dict:
+    """SKU优化报告 -> sku_finished事件（数值转为Python类型，可直接序列化为JSON）"""
+    event = {key: value.item() if isinstance(value, np.generic) else value for key, value in report.items()}
+    event.update(type='sku_finished', done=done, total=total)
+    return event
+
+
+def log_event(event: Dict):
+    """
+    将进度事件输出到控制台（optimize未传入on_event时的默认回调）
+
+    事件类型: optimize_started / sku_started / greedy_done / local_search_move /
+              sku_finished / sku_failed / optimize_finished
+
+    Args:
+        event: 进度事件字典
+    """
+    kind = event['type']
+    if kind == 'optimize_started':
+        print(f"\n开始优化所有SKU的PO日期...")
+        print(f"=" * 60)
+        print(f"共有 {event['total']} 个SKU需要优化\n")
+    elif kind == 'greedy_done':
+        print(f"  初始GAP Top3: {[(g['week'], g['gap'], g['weighted']) for g in event['top_gaps']]}")
+    elif kind == 'local_search_move':
+        move = '移动' if event['swap_with'] is None else f"交换(与PO#{event['swap_with']})"
+        print(f"    {move} PO#{event['po']}(数量{event['qty']:g}): {event['from_week']} -> {event['to_week']}, "
+              f"偏差改善{event['gain']:.2f}")
+    elif kind == 'sku_finished':
+        if event['status'] != 'optimized':
+            return
+        sku = event['sku']
+        initial_deviation, final_deviation = event['initial_deviation'], event['final_deviation']
+        if event['iterations'] > 0:
+            improvement = initial_deviation - final_deviation
+            improvement_pct = (improvement / initial_deviation * 100) if initial_deviation > 0 else 0
+            print(f"SKU {sku}: 优化完成, {event['po_count']}个PO订单, 初始偏差={initial_deviation:.2f}, "
+                  f"{event['engine']}优化{event['iterations']}次迭代后偏差={final_deviation:.2f}, "
+                  f"改善{improvement:.2f}({improvement_pct:.1f}%)")
+        else:
+            print(f"SKU {sku}: 优化完成, {event['po_count']}个PO订单, 加权偏差={final_deviation:.2f}")
+        print(f"  下界={event['lower_bound']:.2f}, 最优性差距={event['gap']:.2f}"
+              f"{'（已证明最优）' if event['proven_optimal'] else ''}")
+        if event['budget_exhausted']:
+            print(f"  SKU {sku}: 已达到时间预算，返回当前最优分配")
+    elif kind == 'sku_failed':
+        print(f"错误: SKU {event['sku']} 优化失败: {event['error']}")
+    elif kind == 'optimize_finished':
+        print(f"\n" + "=" * 60)
+        print(f"优化完成！总共处理 {event['po_count']} 条PO记录")
+        if event['budget_exhausted_skus']:
+            print(f"  {len(event['budget_exhausted_skus'])} 个SKU达到时间预算: {event['budget_exhausted_skus']}")
+        if event['solved']:
+            print(f"  已证明最优: {event['proven']}/{event['solved']} 个SKU, 最优性差距合计: {event['total_gap']:.2f}")
+
+
+def _throttled_check(check, interval: float):
+    """
+    限制调用频率的取消检查：跨进程标志每次查询都是一次进程间通信，
+    搜索循环内频繁调用时每interval秒才真正查询一次，其余时间返回上次的结果
+
+    Args:
+        check: 无参数的检查函数
+        interval: 两次实际查询的最小间隔（秒）
+
+    Returns:
+        无参数的检查函数，一旦返回True之后始终返回True
+    """
+    last_checked = None
+    stopped = False
+
+    def should_stop():
+        nonlocal last_checked, stopped
+        now = time.perf_counter()
+        if not stopped and (last_checked is None or now - last_checked >= interval):
+            last_checked = now
+            stopped = bool(check())
+        return stopped
+
+    return should_stop
+
+
+def _solve_sku_task(task: Dict, should_stop=None, on_event=None) -> Dict:
+    """
+    优化单个SKU的PO日期分配（模块级函数，可直接提交到进程池）
+
+    Args:
+        task: POOptimizer._build_sku_task构建的任务字典
+        should_stop: 无参数的取消检查回调（单进程模式使用），搜索循环内返回True时提前结束；
+            None时使用任务中的跨进程取消标志（task['cancel_flag']，进程池模式）
+        on_event: 进度事件回调，None表示将事件缓存到结果的'events'中（进程池模式由主进程转发）
+
+    Returns:
+        {'sku': SKU名称, 'row_ids': PO行号, 'weeks': 每个PO分配到的周索引（未开始时为None）,
+         'report': 该SKU的优化报告, 'events': 缓存的进度事件（仅on_event为None时）}
+    """
+    sku = task['sku']
+    po_qty = task['po_qty']
+    candidate_weeks = task['candidate_weeks']
+    target_weekly = task['target_weekly']
+    weights = task['weights']
+    week_keys = task['week_keys']
+    engine = task['engine']
+    deadline = task['deadline']
+    sku_time_budget = task['sku_time_budget']
+
+    if should_stop is None and task.get('cancel_flag') is not None:
+        should_stop = _throttled_check(task['cancel_flag'].is_set, POOptimizer.CANCEL_POLL_INTERVAL)
+
+    start = time.time()
+    report = _new_report(sku, engine, len(po_qty))
+    result = {'sku': sku, 'row_ids': task['row_ids'], 'weeks': None, 'report': report}
+    if on_event is None:
+        result['events'] = []
+        on_event = result['events'].append
+
+    # 整批预算已用完：尚未开始的SKU保持原日期
+    if deadline is not None and start >= deadline:
+        report.update(status='not_started', budget_exhausted=True)
+        return result
+
+    on_event({'type': 'sku_started', 'sku': sku, 'po_count': len(po_qty)})
+
+    # 贪心算法：逐个分配PO订单，一次性为所有候选周打分
+    assigned_weeks = POOptimizer._greedy_assign(po_qty, task['original_days'], candidate_weeks,
+                                                task['candidate_days'], target_weekly, weights)
+    weekly_load = np.bincount(assigned_weeks, weights=po_qty, minlength=len(target_weekly))
+
+    # === 阶段2：局部优化（多轮迭代调整） ===
+    # 计算初始偏差
+    initial_deviation = POOptimizer._calculate_weekly_deviation(weekly_load, target_weekly, weights)
+
+    # 初始GAP前3名
+    gaps = target_weekly - weekly_load
+    top3 = np.argsort(-np.abs(gaps) * weights, kind='stable')[:3]
+    on_event({'type': 'greedy_done', 'sku': sku, 'initial_deviation': float(initial_deviation),
+              'top_gaps': [{'week': week_label(week_keys[w]), 'gap': float(gaps[w]),
+                            'weighted': float(weights[w] * abs(gaps[w]))} for w in top3]})
+
+    # 局部搜索的逐次移动事件（仅在有订阅者时产生）
+    on_move = None
+    if task.get('trace_moves'):
+        def on_move(iteration, po, swap_with, from_week, to_week, gain):
+            on_event({'type': 'local_search_move', 'sku': sku, 'iteration': iteration, 'po': int(po),
+                      'swap_with': int(swap_with) if swap_with >= 0 else None, 'qty': float(po_qty[po]),
+                      'from_week': week_label(week_keys[from_week]), 'to_week': week_label(week_keys[to_week]),
+                      'gain': float(gain)})
+
+    # 局部优化：relocate/swap邻域的最优改进搜索，受单SKU预算和整批截止时间约束
+    remaining_time = POOptimizer._remaining_time
+    sku_deadline = start + sku_time_budget if sku_time_budget is not None else None
+    search = LocalSearch(po_qty, assigned_weeks, candidate_weeks, target_weekly, weights,
+                         max_iterations=task['max_iterations'],
+                         time_limit=remaining_time(task['local_search_time_limit'], sku_deadline, deadline),
+                         should_stop=should_stop, on_move=on_move)
+    assigned_weeks, iteration, timed_out = search.run()
+
+    if engine == 'lns' and not timed_out:
+        # 大邻域搜索：从局部最优出发跳出局部最优，最后再用局部搜索收敛
+        # 指定种子时只按迭代次数结束（结果与机器速度无关，可复现），未指定时按lns_time_limit限时
+        seeded = task['seed'] is not None
+        lns = LNSSearch(po_qty, assigned_weeks, candidate_weeks, target_weekly, weights,
+                        seed=f"{task['seed']}-{sku}" if seeded else None,
+                        time_limit=remaining_time(None if seeded else task['lns_time_limit'],
+                                                  sku_deadline, deadline),
+                        max_iterations=task['lns_max_iterations'],
+                        should_stop=should_stop)
+        assigned_weeks, lns_iterations, timed_out = lns.run()
+        polish = LocalSearch(po_qty, assigned_weeks, candidate_weeks, target_weekly, weights,
+                             max_iterations=task['max_iterations'],
+                             time_limit=remaining_time(None, sku_deadline, deadline),
+                             should_stop=should_stop, on_move=on_move)
+        assigned_weeks, polish_iterations, polish_timed_out = polish.run()
+        iteration += lns_iterations + polish_iterations
+        # LNS按自身时间上限结束属于正常完成，只有单SKU预算或整批截止时间耗尽才算达到预算
+        timed_out = polish_timed_out or (timed_out and remaining_time(None, sku_deadline, deadline) == 0.0)
+
+    # 最优性评估：exact引擎在规模不超过阈值时用分支定界求证明最优解，其余SKU报告连续松弛下界
+    bound = None
+    if engine == 'exact' and not timed_out:
+        if len(po_qty) * len(candidate_weeks) <= task['exact_size_limit']:
+            solver = BranchAndBound(po_qty, candidate_weeks, target_weekly, weights,
+                                    initial_assignment=assigned_weeks,
+                                    node_limit=task['exact_node_limit'],
+                                    time_limit=remaining_time(None, sku_deadline, deadline),
+                                    should_stop=should_stop)
+            assigned_weeks, _, bound, proven = solver.solve()
+            iteration += solver.nodes
+            timed_out = not proven and remaining_time(None, sku_deadline, deadline) == 0.0
+        else:
+            report['engine'] = 'greedy'  # 超过规模阈值，回退到启发式结果
+    if bound is None:
+        bound = lower_bound(po_qty, candidate_weeks, target_weekly, weights)
+    weekly_load = np.bincount(assigned_weeks, weights=po_qty, minlength=len(target_weekly))
+
+    # 计算最终偏差
+    final_deviation = POOptimizer._calculate_weekly_deviation(weekly_load, target_weekly, weights)
+
+    gap = max(final_deviation - bound, 0.0)
+
+    report.update(initial_deviation=initial_deviation, final_deviation=final_deviation,
+                  iterations=iteration, budget_exhausted=timed_out,
+                  lower_bound=bound, gap=gap, proven_optimal=gap <= 1e-6)
+
+    result['weeks'] = np.asarray(assigned_weeks, dtype=np.int64)
+    return result
+
+
 def main():
-    """主函数"""
-    # 初始化优化器
-    optimizer = POOptimizer(
-        schedule_aim_file='shechle_aim.xlsx',
-        po_lists_file='po_lists.xlsx'
-    )
-
-    # 执行优化（使用多进程加速）
-    optimized_po = optimizer.optimize(max_workers=4)
-
-    # 保存结果
-    optimizer.save_results(optimized_po, 'po_lists_optimized.xlsx')
+    """命令行入口：优化PO日期并保存结果"""
+    import sys
+    from .pipeline import OptimizationPipeline
+
+    if len(sys.argv) < 3:
+        print("用法: python -m src.core.po_adjustment <schedule_file> <po_file> [output_file]")
+        print("\n示例:")
+        print("  python -m src.core.po_adjustment data/input/shechle_aim.xlsx data/input/po_lists.xlsx "
+              "data/output/po_lists_optimized.xlsx")
+        return
+
+    output_file = sys.argv[3] if len(sys.argv) > 3 else 'po_lists_optimized.xlsx'
+
+    pipeline = OptimizationPipeline(sys.argv[1], sys.argv[2])
+    pipeline.run()
+    pipeline.save_results(output_file)
 
     print("\n优化完成！")
 
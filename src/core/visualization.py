@@ -5,6 +5,7 @@ PO调整结果可视化对比
 功能：按SKU+周的维度对比排程目标和调整后PO数量的差异
 """
 
+import os
 import pandas as pd
 import matplotlib
 # 在导入pyplot之前设置后端（解决macOS GUI线程问题）
@@ -14,6 +15,9 @@ from datetime import datetime
 import warnings
 warnings.filterwarnings('ignore')
 
+from .weeks import week_key
+from .input_cache import load_schedule, load_po_list, write_table
+
 # 设置中文字体
 matplotlib.rcParams['font.sans-serif'] = ['Arial Unicode MS', 'SimHei', 'DejaVu Sans']
 matplotlib.rcParams['axes.unicode_minus'] = False
@@ -22,32 +26,21 @@ matplotlib.rcParams['axes.unicode_minus'] = False
 class POVisualizer:
     """PO调整结果可视化器"""
 
-    def __init__(self, schedule_aim_file: str, original_po_file: str, optimized_po_file: str):
+    def __init__(self, schedule_aim_file, original_po_file, optimized_po_file):
         """
         初始化可视化器
 
         Args:
-            schedule_aim_file: 排程目标文件
-            original_po_file: 原始PO清单文件
-            optimized_po_file: 优化后PO清单文件
+            schedule_aim_file: 排程目标（文件路径或DataFrame）
+            original_po_file: 原始PO清单（文件路径或DataFrame）
+            optimized_po_file: 优化后PO清单（文件路径或DataFrame）
         """
-        self.schedule_aim = pd.read_excel(schedule_aim_file)
-        self.original_po = pd.read_excel(original_po_file)
-        self.optimized_po = pd.read_excel(optimized_po_file)
-
-        # 标准化PO清单列名（适配新格式）
-        column_mapping = {
-            'SKU/Spart': 'SKU',
-            '发运行数量': '数量',
-            '要求交付日期': '修改要货日期'
-        }
-        self.original_po = self.original_po.rename(columns=column_mapping)
-        self.optimized_po = self.optimized_po.rename(columns=column_mapping)
-
-        # 确保日期格式
-        self.schedule_aim['日期'] = pd.to_datetime(self.schedule_aim['日期'])
-        self.original_po['修改要货日期'] = pd.to_datetime(self.original_po['修改要货日期'])
-        self.optimized_po['修改要货日期'] = pd.to_datetime(self.optimized_po['修改要货日期'])
+        # 加载并标准化输入（列名、日期类型、week_num），相同文件读取Parquet缓存
+        self.schedule_aim = load_schedule(schedule_aim_file)
+        self.original_po = load_po_list(original_po_file)
+        self.optimized_po = load_po_list(optimized_po_file)
+        # 最近一次generate_summary_report实际写出的报告文件路径
+        self.report_files = []
 
         print("数据加载完成:")
         print(f"  排程目标: {len(self.schedule_aim)} 条记录")
@@ -72,9 +65,7 @@ class POVisualizer:
 
         # 计算week_num (如果不存在)
         if 'week_num' not in df_copy.columns:
-            df_copy['week_num'] = df_copy[date_col].apply(
-                lambda x: x.isocalendar()[0] * 100 + x.isocalendar()[1]
-            )
+            df_copy['week_num'] = week_key(df_copy[date_col])
 
         # 按SKU和week_num汇总
         weekly_summary = df_copy.groupby([sku_col, 'week_num'])[qty_col].sum().reset_index()
@@ -247,7 +238,13 @@ class POVisualizer:
         生成汇总报告
 
         Args:
-            save_path: 报告保存路径
+            save_path: 报告保存路径；.csv/.parquet/.feather时详细对比和汇总统计
+                分别保存为 <文件名>_detail 和 <文件名>_summary 两个文件
+
+        实际写出的报告文件路径列表保存在self.report_files
+
+        Returns:
+            (详细对比DataFrame, 汇总统计DataFrame)
         """
         comparison = self.calculate_comparison_metrics()
 
@@ -271,12 +268,21 @@ class POVisualizer:
 
         summary_df = pd.DataFrame(summary_stats)
 
-        # 保存到Excel（多个sheet）
-        with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
-            comparison.to_excel(writer, sheet_name='详细对比', index=False)
-            summary_df.to_excel(writer, sheet_name='汇总统计', index=False)
-
-        print(f"汇总报告已保存至: {save_path}")
+        stem, ext = os.path.splitext(save_path)
+        if ext.lower() in ('.csv', '.parquet', '.feather', '.arrow'):
+            # 单表格式：每个sheet保存为一个文件
+            report_files = [f"{stem}_detail{ext}", f"{stem}_summary{ext}"]
+            write_table(comparison, report_files[0])
+            write_table(summary_df, report_files[1])
+            print(f"汇总报告已保存至: {', '.join(report_files)}")
+        else:
+            # 保存到Excel（多个sheet）
+            with pd.ExcelWriter(save_path, engine='openpyxl') as writer:
+                comparison.to_excel(writer, sheet_name='详细对比', index=False)
+                summary_df.to_excel(writer, sheet_name='汇总统计', index=False)
+            report_files = [save_path]
+
+            print(f"汇总报告已保存至: {save_path}")
 
         # 打印汇总统计
         print("\n" + "=" * 80)
@@ -285,34 +291,27 @@ class POVisualizer:
         print(summary_df.to_string(index=False))
         print("=" * 80)
 
+        self.report_files = report_files
         return comparison, summary_df
 
 
 def main():
-    """主函数"""
-    print("开始生成可视化对比...\n")
-
-    # 初始化可视化器
-    visualizer = POVisualizer(
-        schedule_aim_file='shechle_aim.xlsx',
-        original_po_file='po_lists.xlsx',
-        optimized_po_file='po_lists_optimized.xlsx'
-    )
+    """命令行入口：根据优化前后的PO清单生成对比报告和图表"""
+    import sys
 
-    # 生成汇总报告
-    comparison, summary = visualizer.generate_summary_report('comparison_report.xlsx')
+    if len(sys.argv) < 4:
+        print("用法: python -m src.core.visualization <schedule_file> <po_original> <po_optimized> [output_dir]")
+        return
 
-    # 创建对比图表
-    visualizer.create_comparison_plots('po_comparison.png')
+    output_dir = sys.argv[4] if len(sys.argv) > 4 else '.'
+    os.makedirs(output_dir, exist_ok=True)
 
-    # 创建偏差对比图
-    visualizer.create_deviation_plot('deviation_comparison.png')
+    visualizer = POVisualizer(sys.argv[1], sys.argv[2], sys.argv[3])
+    visualizer.generate_summary_report(os.path.join(output_dir, 'comparison_report.xlsx'))
+    visualizer.create_comparison_plots(os.path.join(output_dir, 'po_comparison.png'))
+    visualizer.create_deviation_plot(os.path.join(output_dir, 'deviation_comparison.png'))
 
     print("\n所有可视化和报告生成完成！")
-    print("\n生成的文件:")
-    print("  1. comparison_report.xlsx - 详细对比报告")
-    print("  2. po_comparison.png - 数量对比图")
-    print("  3. deviation_comparison.png - 偏差对比图")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+周次工具模块 - 各模块统一使用的ISO周计算（向量化）
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _to_days(dates) -> np.ndarray:
+    """日期序列转换为自1970-01-01起的天序号数组，NaT保持为NaT"""
+    return pd.to_datetime(pd.Series(dates)).to_numpy(dtype='datetime64[D]')
+
+
+def week_index(dates) -> np.ndarray:
+    """
+    将日期转换为自1969-12-29（周一）起的绝对周序号
+
+    Args:
+        dates: 日期序列
+
+    Returns:
+        周序号数组
+    """
+    days = _to_days(dates).astype(np.int64)
+    # 1970-01-01是周四，+3后按7整除即对齐到周一
+    return (days + 3) // 7
+
+
+def week_key(dates) -> np.ndarray:
+    """
+    计算ISO周编号（格式：YYYYWW，如 202550）
+
+    与 date.isocalendar() 的年和周一致：一周属于其周四所在的年份。
+
+    Args:
+        dates: 日期序列
+
+    Returns:
+        周编号数组（int64）；存在空日期时为float数组，空日期对应NaN
+    """
+    days = _to_days(dates)
+    missing = np.isnat(days)
+    day_num = np.where(missing, 0, days.astype(np.int64))
+
+    # 本周周四决定ISO年份，周数 = 周四距该年1月1日的天数 // 7 + 1
+    thursday = day_num - (day_num + 3) % 7 + 3
+    year_start = thursday.astype('datetime64[D]').astype('datetime64[Y]')
+    week = (thursday - year_start.astype('datetime64[D]').astype(np.int64)) // 7 + 1
+    keys = (year_start.astype(np.int64) + 1970) * 100 + week
+
+    if missing.any():
+        keys = keys.astype(float)
+        keys[missing] = np.nan
+    return keys
+
+
+def week_label(week_num) -> str:
+    """周编号转换为周次标签（如 202550 -> 2025W50）"""
+    week_num = int(week_num)
+    return f"{week_num // 100}W{week_num % 100:02d}"
+
+
+def week_key_index(week_nums) -> np.ndarray:
+    """
+    ISO周编号转换为绝对周序号（week_key的逆运算，与week_index的序号一致）
+
+    Args:
+        week_nums: 周编号序列（如 202550）
+
+    Returns:
+        周序号数组
+    """
+    keys = np.asarray(week_nums, dtype=np.int64)
+    # 1月4日总在该ISO年的第1周
+    jan4 = (keys // 100 - 1970).astype('datetime64[Y]').astype('datetime64[D]').astype(np.int64) + 3
+    return (jan4 + 3) // 7 + keys % 100 - 1
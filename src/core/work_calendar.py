@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+规划日历模块 - 规划期与节假日配置，编译为有效周一的周位图并按内容哈希缓存
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import pandas as pd
+
+from .weeks import week_index
+
+# 默认缓存目录（项目根目录下的data/cache）
+DEFAULT_CACHE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../data/cache'))
+
+# 默认规划期
+DEFAULT_START_DATE = '2025-10-01'
+DEFAULT_END_DATE = '2026-06-01'
+
+# 中国节假日（2025-2026年主要节假日），区间为闭区间
+DEFAULT_HOLIDAYS = [
+    # 2025年节假日
+    '2025-01-01',  # 元旦
+    {'start': '2025-01-28', 'end': '2025-02-04'},  # 春节
+    {'start': '2025-04-05', 'end': '2025-04-07'},  # 清明节
+    {'start': '2025-05-01', 'end': '2025-05-03'},  # 劳动节
+    {'start': '2025-05-31', 'end': '2025-06-02'},  # 端午节
+    {'start': '2025-10-01', 'end': '2025-10-08'},  # 国庆节+中秋节
+    # 2026年节假日
+    {'start': '2026-01-01', 'end': '2026-01-03'},  # 元旦
+    {'start': '2026-02-16', 'end': '2026-02-23'},  # 春节
+    {'start': '2026-04-05', 'end': '2026-04-07'},  # 清明节
+    {'start': '2026-05-01', 'end': '2026-05-03'},  # 劳动节
+]
+
+
+class PlanningCalendar:
+    """
+    规划日历
+
+    规划期内每个周一是否可用（非节假日）编译为一个按周排列的布尔位图，
+    有效周一以周序号和天序号数组提供，供优化器用searchsorted按日期截取。
+    编译结果按配置内容的哈希缓存到磁盘，相同配置再次加载时直接读取。
+    """
+
+    CACHE_VERSION = 1
+
+    def __init__(self, start_date=DEFAULT_START_DATE, end_date=DEFAULT_END_DATE,
+                 holidays=None, cache_dir=DEFAULT_CACHE_DIR):
+        """
+        初始化日历
+
+        Args:
+            start_date: 规划期开始日期
+            end_date: 规划期结束日期（含）
+            holidays: 节假日列表，元素为日期或{'start': 日期, 'end': 日期}闭区间，None表示使用默认节假日
+            cache_dir: 编译结果缓存目录，None表示不缓存
+        """
+        self.start_date = pd.Timestamp(start_date).normalize()
+        self.end_date = pd.Timestamp(end_date).normalize()
+        if self.end_date < self.start_date:
+            raise ValueError(f"规划期结束日期 {self.end_date.date()} 早于开始日期 {self.start_date.date()}")
+        self.holiday_days = self._expand_holidays(DEFAULT_HOLIDAYS if holidays is None else holidays)
+        self.cache_dir = cache_dir
+
+        self.first_week, self.week_mask = self._load_or_compile()
+
+        # 有效周一：周序号（绝对周序号，升序）与天序号
+        self.monday_weeks = self.first_week + np.flatnonzero(self.week_mask)
+        self.monday_days = self.monday_weeks * 7 - 3
+
+    @classmethod
+    def load(cls, path: str = None, cache_dir=DEFAULT_CACHE_DIR, **overrides) -> 'PlanningCalendar':
+        """
+        从JSON配置文件和参数加载日历
+
+        文件格式: {"start_date": "2025-10-01", "end_date": "2026-06-01",
+                   "holidays": ["2026-01-01", {"start": "2026-02-16", "end": "2026-02-23"}]}
+        未给出的项使用默认值；overrides中非None的参数覆盖文件内容。
+
+        Args:
+            path: 配置文件路径，None表示只使用参数
+            cache_dir: 编译结果缓存目录，None表示不缓存
+            overrides: start_date / end_date / holidays
+
+        Returns:
+            PlanningCalendar
+        """
+        config = {}
+        if path:
+            with open(path, 'r', encoding='utf-8') as f:
+                config = json.load(f)
+        config.update({key: value for key, value in overrides.items() if value is not None})
+        return cls(start_date=config.get('start_date', DEFAULT_START_DATE),
+                   end_date=config.get('end_date', DEFAULT_END_DATE),
+                   holidays=config.get('holidays'),
+                   cache_dir=cache_dir)
+
+    @staticmethod
+    def _expand_holidays(holidays) -> np.ndarray:
+        """节假日列表（日期或闭区间）展开为排序去重的天序号数组"""
+        days = []
+        for item in holidays:
+            if isinstance(item, dict):
+                start = np.datetime64(pd.Timestamp(item['start']).date(), 'D')
+                end = np.datetime64(pd.Timestamp(item['end']).date(), 'D')
+                days.append(np.arange(start, end + 1).astype(np.int64))
+            else:
+                days.append(np.array([np.datetime64(pd.Timestamp(item).date(), 'D').astype(np.int64)]))
+        return np.unique(np.concatenate(days)) if days else np.empty(0, dtype=np.int64)
+
+    def content_hash(self) -> str:
+        """日历配置的内容哈希（规划期 + 节假日），作为缓存键"""
+        digest = hashlib.sha256()
+        digest.update(f"v{self.CACHE_VERSION}|{self.start_date.date()}|{self.end_date.date()}|".encode())
+        digest.update(self.holiday_days.astype('<i8').tobytes())
+        return digest.hexdigest()[:16]
+
+    def _compile(self):
+        """
+        编译周位图
+
+        Returns:
+            (规划期第一周的周序号, 每周周一是否可用的布尔数组)
+        """
+        start_day = np.datetime64(self.start_date.date(), 'D').astype(np.int64)
+        # 第一个不早于开始日期的周一，到最后一个不晚于结束日期的周一
+        first_week = int(week_index(pd.Series([self.start_date]))[0])
+        if first_week * 7 - 3 < start_day:
+            first_week += 1
+        last_week = int(week_index(pd.Series([self.end_date]))[0])
+
+        mondays = np.arange(first_week, last_week + 1) * 7 - 3
+        week_mask = ~np.isin(mondays, self.holiday_days)
+        return first_week, week_mask
+
+    def _load_or_compile(self):
+        """读取缓存的编译结果，不存在时编译并写入缓存"""
+        if self.cache_dir is None:
+            return self._compile()
+
+        cache_file = os.path.join(self.cache_dir, f"calendar_{self.content_hash()}.npz")
+        if os.path.exists(cache_file):
+            try:
+                with np.load(cache_file) as cached:
+                    return int(cached['first_week']), cached['week_mask']
+            except (OSError, KeyError, ValueError):
+                pass  # 缓存损坏时重新编译
+
+        first_week, week_mask = self._compile()
+        tmp_file = None
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # 临时文件名唯一，同一进程的多个线程同时编译也不会写到同一个文件
+            with tempfile.NamedTemporaryFile(dir=self.cache_dir, suffix='.tmp', delete=False) as f:
+                tmp_file = f.name
+                np.savez(f, first_week=first_week, week_mask=week_mask)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"警告: 日历缓存写入失败: {e}")
+            if tmp_file is not None and os.path.exists(tmp_file):
+                os.remove(tmp_file)
+        return first_week, week_mask
+
+    @property
+    def valid_mondays(self) -> pd.DatetimeIndex:
+        """有效周一日期"""
+        return pd.to_datetime(self.monday_days, unit='D')
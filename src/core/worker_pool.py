@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+常驻工作进程池 - 供Web服务等长期运行的进程在多次优化之间共享，
+使用spawn方式创建进程并预先导入pandas/numpy和求解模块
+"""
+
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+
+def _init_worker():
+    """工作进程初始化：预先导入求解所需的模块，首个SKU无需再等待导入"""
+    import numpy  # noqa: F401
+    import pandas  # noqa: F401
+    from . import po_adjustment  # noqa: F401
+
+
+def _ping() -> int:
+    """预热任务：返回工作进程ID"""
+    return os.getpid()
+
+
+class WorkerPool:
+    """
+    常驻工作进程池
+
+    进程以spawn方式创建，不继承父进程的线程和锁（Flask等多线程服务中fork不安全），
+    可在多个请求之间共享：submit为线程安全的，各次优化按自己的max_workers限制同时提交的SKU数。
+    工作进程异常退出导致进程池损坏时，下一次提交会自动重建进程池。
+    跨进程的取消标志由一个常驻的Manager进程创建（start或首次调用create_event时启动）。
+    """
+
+    def __init__(self, max_workers: int = None):
+        """
+        初始化进程池（进程在start或首次提交时创建）
+
+        Args:
+            max_workers: 工作进程数，None表示CPU核心数
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._executor = None
+        self._manager = None
+        self._lock = threading.Lock()
+
+    def _create(self) -> ProcessPoolExecutor:
+        """创建spawn方式的进程池（调用方须持有锁）"""
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context('spawn'),
+                                   initializer=_init_worker)
+
+    def _get(self, broken: ProcessPoolExecutor = None) -> ProcessPoolExecutor:
+        """当前进程池，不存在或已损坏（broken）时重新创建"""
+        with self._lock:
+            if self._executor is None or self._executor is broken:
+                if broken is not None:
+                    print("警告: 工作进程池已损坏，重新创建")
+                    broken.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._create()
+            return self._executor
+
+    def start(self):
+        """创建进程池并提交预热任务，使全部工作进程在后台启动，不等待其完成；同时启动Manager进程"""
+        executor = self._get()
+        for _ in range(self.max_workers):
+            executor.submit(_ping)
+        self._get_manager()
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        提交任务（接口与Executor.submit相同）
+
+        Args:
+            fn: 模块级函数（须可被pickle）
+            args, kwargs: 函数参数
+
+        Returns:
+            Future
+        """
+        executor = self._get()
+        try:
+            return executor.submit(fn, *args, **kwargs)
+        except BrokenProcessPool:
+            return self._get(broken=executor).submit(fn, *args, **kwargs)
+
+    def create_event(self):
+        """
+        创建跨进程的事件标志（可随任务传给工作进程，用于通知正在运行的任务取消）
+
+        Returns:
+            Manager管理的Event代理
+        """
+        return self._get_manager().Event()
+
+    def _get_manager(self):
+        """常驻的Manager进程，不存在时以spawn方式启动"""
+        with self._lock:
+            if self._manager is None:
+                self._manager = multiprocessing.get_context('spawn').Manager()
+            return self._manager
+
+    def shutdown(self, wait: bool = True):
+        """
+        关闭进程池
+
+        Args:
+            wait: 是否等待正在执行的任务完成
+        """
+        with self._lock:
+            executor, self._executor = self._executor, None
+            manager, self._manager = self._manager, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+        if manager is not None:
+            manager.shutdown()
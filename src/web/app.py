@@ -4,7 +4,7 @@
 PO优化Web应用 - Flask后端
 """
 
-from flask import Flask, render_template, request, jsonify, send_file
+from flask import Flask, render_template, request, jsonify, send_file, Response, stream_with_context
 from werkzeug.utils import secure_filename
 import os
 import sys
@@ -12,15 +12,20 @@ import pandas as pd
 import json
 from datetime import datetime
 import traceback
+import functools
+import uuid
 
 # 添加项目根目录到路径
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
 sys.path.insert(0, PROJECT_ROOT)
 
-from src.core.po_adjustment import POOptimizer
-from src.core.visualization import POVisualizer
-from src.core.data_transformer import ScheduleTransformer
-from src.core.gap_analysis import GapAnalyzer
+from src.core.pipeline import OptimizationPipeline
+from src.core.gap_analysis import GapMatrix
+from src.core.po_adjustment import POOptimizer, log_event
+from src.core.input_cache import read_schedule, load_po_list, cache_schedule
+from src.core.worker_pool import WorkerPool
+from src.web.jobs import JobManager
+from src.web.workspaces import WorkspaceManager
 
 # 使用根目录的templates和static
 app = Flask(__name__,
@@ -28,15 +33,25 @@ app = Flask(__name__,
             static_folder=os.path.join(PROJECT_ROOT, 'static'))
 
 app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['UPLOAD_FOLDER'] = os.path.join(PROJECT_ROOT, 'data/uploads')
-app.config['RESULT_FOLDER'] = os.path.join(PROJECT_ROOT, 'data/output')
-
-# 确保文件夹存在
-os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
-os.makedirs(app.config['RESULT_FOLDER'], exist_ok=True)
+app.config['WORKSPACE_FOLDER'] = os.path.join(PROJECT_ROOT, 'data/workspaces')
 
 ALLOWED_EXTENSIONS = {'xlsx', 'xls'}
 
+# 每次上传创建独立工作区（输入文件、解析缓存、结果文件），超过WORKSPACE_TTL秒未使用的工作区自动清理
+workspaces = WorkspaceManager(app.config['WORKSPACE_FOLDER'],
+                              ttl=float(os.environ.get('WORKSPACE_TTL', 24 * 3600)))
+
+# 后台优化任务队列：同时执行的任务数由环境变量MAX_CONCURRENT_JOBS设置，超出的任务排队
+jobs = JobManager(max_workers=int(os.environ.get('MAX_CONCURRENT_JOBS', 2)))
+
+# 优化任务共享的常驻工作进程池，进程数由环境变量OPTIMIZE_WORKERS设置（默认CPU核心数）
+# 进程池在服务启动时预热（见文件末尾和gunicorn.conf.py），未预热时在首次优化时创建；
+# 不在导入时创建，spawn子进程会重新导入本模块
+worker_pool = WorkerPool(max_workers=int(os.environ.get('OPTIMIZE_WORKERS', 0)) or None)
+
+# 进度事件流无新事件时的心跳间隔（秒），防止代理断开空闲连接
+SSE_KEEPALIVE = 15
+
 
 def allowed_file(filename):
     """检查文件扩展名是否允许"""
@@ -68,71 +83,45 @@ def upload_files():
         if not (allowed_file(schedule_file.filename) and allowed_file(po_file.filename)):
             return jsonify({'success': False, 'error': '只支持.xlsx和.xls文件'}), 400
 
-        # 保存文件
+        # 保存文件到工作区：重新上传时沿用已有工作区，否则创建新工作区
         schedule_filename = secure_filename(schedule_file.filename)
         po_filename = secure_filename(po_file.filename)
 
-        schedule_path = os.path.join(app.config['UPLOAD_FOLDER'], 'schedule_aim.xlsx')
-        po_path = os.path.join(app.config['UPLOAD_FOLDER'], 'po_lists.xlsx')
+        workspace = workspaces.get(request.form.get('workspace_id'))
+        # 工作区中有排队或执行中的任务时不允许覆盖输入文件（任务执行期间会读取这些文件）
+        if workspace is not None and jobs.active(workspace_id=workspace.id):
+            return jsonify({'success': False, 'error': '当前工作区有正在执行的优化任务，请等待完成或取消后再上传'}), 409
+        workspace = workspace or workspaces.create()
+        workspace.touch()
+        schedule_path = workspace.schedule_path
+        po_path = workspace.po_path
 
         schedule_file.save(schedule_path)
         po_file.save(po_path)
 
-        # 读取排程文件
-        schedule_df_raw = pd.read_excel(schedule_path)
-
-        # 检测排程文件格式并自动转换
-        transformer = ScheduleTransformer()
-        format_type = transformer.detect_format(schedule_df_raw)
-
-        conversion_info = {'format': format_type, 'converted': False}
+        # 先按表头检测排程文件格式，再读取并自动转换（交叉表 -> 长表，统一列名和week_num）
+        try:
+            schedule_df, schema = read_schedule(schedule_path)
+        except ValueError:
+            return jsonify({
+                'success': False,
+                'error': '无法识别排程文件格式。请确保文件为交叉表或长表格式。'
+            }), 400
+        format_type = schema['format']
 
+        conversion_info = {'format': format_type, 'converted': format_type == 'cross_table'}
         if format_type == 'cross_table':
-            # 需要转换：二维交叉表 -> 长表
-            print(f"检测到交叉表格式，执行自动转换...")
-            schedule_df = transformer.transform_cross_table_to_long(schedule_df_raw)
-            schedule_df = transformer.add_week_number(schedule_df)
-
-            # 保存转换后的文件
-            schedule_df.to_excel(schedule_path, index=False)
-
-            conversion_info['converted'] = True
             conversion_info['message'] = '已自动转换交叉表格式为长表格式'
-            print(f"转换完成：{schedule_df_raw.shape} -> {schedule_df.shape}")
-
-        elif format_type == 'long_format':
-            # 已是长表格式，无需转换
-            schedule_df = schedule_df_raw.copy()
-
-            # 标准化列名
-            columns_map = {}
-            for col in schedule_df.columns:
-                col_lower = str(col).lower()
-                if '日期' in col_lower or 'date' in col_lower:
-                    columns_map[col] = '日期'
-                elif 'sku' in col_lower:
-                    columns_map[col] = 'SKU'
-                elif '计划' in col_lower or '产量' in col_lower or 'quantity' in col_lower:
-                    columns_map[col] = '计划产量'
-
-            schedule_df = schedule_df.rename(columns=columns_map)
-
-            # 添加week_num（如果没有）
-            if 'week_num' not in schedule_df.columns and '日期' in schedule_df.columns:
-                schedule_df = transformer.add_week_number(schedule_df)
-                schedule_df.to_excel(schedule_path, index=False)
-
+            print(f"转换完成：{len(schema['date_columns'])} 个日期列 -> {schedule_df.shape}")
+        else:
             conversion_info['message'] = '文件已是长表格式'
             print("文件已是长表格式，无需转换")
 
-        else:
-            return jsonify({
-                'success': False,
-                'error': '无法识别排程文件格式。请确保文件为交叉表或长表格式。'
-            }), 400
+        # 标准化结果登记为上传文件的列式缓存，优化和分析时直接读取，不再回写Excel
+        cache_schedule(schedule_df, schedule_path, cache_dir=workspace.cache_dir)
 
-        # 读取PO文件
-        po_df = pd.read_excel(po_path)
+        # 读取PO文件（标准化列名并写入列式缓存）
+        po_df = load_po_list(po_path, cache_dir=workspace.cache_dir)
 
         # 获取SKU列表
         schedule_skus = schedule_df['SKU'].unique().tolist() if 'SKU' in schedule_df.columns else []
@@ -142,6 +131,7 @@ def upload_files():
             'success': True,
             'message': '文件上传成功',
             'data': {
+                'workspace_id': workspace.id,
                 'schedule_aim': {
                     'filename': schedule_filename,
                     'rows': len(schedule_df),
@@ -164,102 +154,255 @@ def upload_files():
         return jsonify({'success': False, 'error': f'上传失败: {str(e)}'}), 500
 
 
+def run_optimization_job(job, params, workspace):
+    """
+    后台执行优化、报告、差异分析和图表生成
+
+    Args:
+        job: 后台任务（用于更新进度和检查取消）
+        params: 优化参数
+        workspace: 工作区（输入文件、缓存和结果文件所在位置）
+
+    Returns:
+        dict: 优化结果数据（与前端结果页使用的结构一致）
+    """
+    job.update_progress('loading', '📊 正在加载数据文件...')
+
+    # 创建优化流水线（传递参数）：输入只加载一次，可视化和差异分析直接使用内存中的结果
+    pipeline = OptimizationPipeline(workspace.schedule_path, workspace.po_path,
+                                    cache_dir=workspace.cache_dir,
+                                    priority_weeks=params['priority_weeks'],
+                                    priority_weight=params['priority_weight'])
+    job.check_cancelled()
+
+    def on_event(event):
+        # 优化器事件原样转发给订阅方；SKU级事件同时输出到服务端日志并更新任务进度
+        job.emit(event)
+        if event['type'] != 'local_search_move':
+            log_event(event)
+        if event['type'] == 'optimize_started':
+            job.update_progress('optimizing', '⚡ 正在执行优化算法...', done=0, total=event['total'])
+        elif event['type'] in ('sku_finished', 'sku_failed'):
+            job.update_progress('optimizing', f"⚡ 正在优化SKU {event['sku']} ({event['done']}/{event['total']})",
+                                done=event['done'], total=event['total'], sku=event['sku'])
+
+    # 执行优化：SKU提交到共享的常驻进程池（spawn方式创建，在多线程的Flask服务中可安全使用）
+    pipeline.run(max_workers=params['max_workers'], time_budget=params['time_budget'],
+                 sku_time_budget=params['sku_time_budget'], engine=params['engine'],
+                 seed=params['seed'], on_event=on_event, cancel_event=job.cancel_event, executor=worker_pool)
+    job.check_cancelled()
+
+    job.update_progress('reporting', '📈 正在生成报告...')
+
+    # 保存结果：结果ID由时间戳加随机后缀组成，同一秒内完成的多个任务的结果文件不会互相覆盖
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    result_id = f"{timestamp}_{uuid.uuid4().hex[:8]}"
+    result_path = os.path.join(workspace.output_dir, f'po_optimized_{result_id}.xlsx')
+    pipeline.save_results(result_path)
+
+    # 生成可视化和报告
+    visualizer = pipeline.visualizer
+
+    report_path = os.path.join(workspace.output_dir, f'report_{result_id}.xlsx')
+    comparison_path = os.path.join(workspace.output_dir, f'comparison_{result_id}.png')
+
+    comparison, summary = visualizer.generate_summary_report(report_path)
+    job.check_cancelled()
+    job.update_progress('reporting', '🎨 正在生成可视化图表...')
+    visualizer.create_comparison_plots(comparison_path)
+    job.check_cancelled()
+
+    # 生成差异分析表
+    job.update_progress('reporting', '🔍 正在生成差异分析表...')
+    gap_analysis_path = os.path.join(workspace.output_dir, f'gap_analysis_{result_id}.xlsx')
+    gap_analyzer = pipeline.gap_analyzer
+    gap_analyzer.export_to_excel(gap_analysis_path, highlight_top_percent=30)
+
+    # 差异矩阵保存到工作区，前端通过/api/gap按需分页读取；结果中只返回统计和周次
+    gap_matrix = gap_analyzer.to_matrix(priority_weeks=params['priority_weeks'],
+                                        priority_weight=params['priority_weight'],
+                                        highlight_top_percent=30)
+    gap_matrix.save(os.path.join(workspace.output_dir, f'gap_matrix_{result_id}.npz'))
+    gap_json = {
+        'result_id': result_id,
+        'weeks': gap_matrix.week_labels.tolist(),
+        'highlight_threshold': gap_matrix.highlight_threshold,
+        'stats': gap_analyzer.generate_summary_stats()
+    }
+
+    # 准备返回数据
+    summary_data = summary.to_dict('records')
+
+    return {
+        'workspace_id': workspace.id,
+        'timestamp': timestamp,
+        'summary': summary_data,
+        'gap_analysis': gap_json,
+        'budget_exhausted_skus': pipeline.budget_exhausted_skus,
+        'files': {
+            'optimized_po': f'po_optimized_{result_id}.xlsx',
+            'report': f'report_{result_id}.xlsx',
+            'comparison_chart': f'comparison_{result_id}.png',
+            'gap_analysis': f'gap_analysis_{result_id}.xlsx'
+        }
+    }
+
+
 @app.route('/api/optimize', methods=['POST'])
 def optimize():
-    """执行优化"""
+    """提交优化任务，立即返回任务ID"""
     try:
         # 获取参数
-        params = request.json
-        priority_weeks = params.get('priority_weeks', 8)
-        priority_weight = params.get('priority_weight', 10.0)
-        date_weight = 0.0  # 不考虑日期接近度目标
-        max_workers = params.get('max_workers', 4)
-
-        # 检查上传的文件是否存在
-        schedule_path = os.path.join(app.config['UPLOAD_FOLDER'], 'schedule_aim.xlsx')
-        po_path = os.path.join(app.config['UPLOAD_FOLDER'], 'po_lists.xlsx')
+        params = request.json or {}
+        job_params = {
+            'priority_weeks': params.get('priority_weeks', 8),
+            'priority_weight': params.get('priority_weight', 10.0),
+            'max_workers': params.get('max_workers', 4),
+            'time_budget': params.get('time_budget'),
+            'sku_time_budget': params.get('sku_time_budget'),
+            'engine': params.get('engine', 'greedy'),
+            'seed': params.get('seed')
+        }
 
-        if not (os.path.exists(schedule_path) and os.path.exists(po_path)):
+        # 参数校验：无效的引擎或进程数直接返回400，不提交后台任务
+        if job_params['engine'] not in POOptimizer.ENGINES:
+            return jsonify({'success': False,
+                            'error': f"不支持的优化引擎: {job_params['engine']}（可选: {' / '.join(POOptimizer.ENGINES)}）"}), 400
+        try:
+            job_params['max_workers'] = int(job_params['max_workers'])
+        except (TypeError, ValueError):
+            job_params['max_workers'] = 0
+        if job_params['max_workers'] < 1:
+            return jsonify({'success': False, 'error': 'max_workers须为不小于1的整数'}), 400
+
+        # 检查工作区中上传的文件是否存在
+        workspace = workspaces.get(params.get('workspace_id'))
+        if workspace is None or not workspace.has_inputs:
             return jsonify({'success': False, 'error': '请先上传文件'}), 400
+        workspace.touch()
+        job_params['workspace_id'] = workspace.id
 
-        # 创建优化器（传递参数）
-        optimizer = POOptimizer(schedule_path, po_path)
-
-        # 临时修改优化参数（通过猴子补丁）
-        original_calc = optimizer._calculate_weekly_deviation
-
-        def patched_calc(po_assignments, target_weekly, priority_weeks_param=priority_weeks):
-            return original_calc(po_assignments, target_weekly, priority_weeks_param)
-
-        optimizer._calculate_weekly_deviation = patched_calc
-
-        # 执行优化（注意：在Flask环境中强制使用单进程模式以避免多进程兼容性问题）
-        # 多进程模式在macOS + Python 3.13 + Flask环境中存在兼容性问题
-        optimized_po = optimizer.optimize(max_workers=1)
-
-        # 保存结果
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        result_path = os.path.join(app.config['RESULT_FOLDER'], f'po_optimized_{timestamp}.xlsx')
-        optimized_po.to_excel(result_path, index=False)
-
-        # 生成可视化和报告
-        visualizer = POVisualizer(schedule_path, po_path, result_path)
-
-        report_path = os.path.join(app.config['RESULT_FOLDER'], f'report_{timestamp}.xlsx')
-        comparison_path = os.path.join(app.config['RESULT_FOLDER'], f'comparison_{timestamp}.png')
-
-        comparison, summary = visualizer.generate_summary_report(report_path)
-        visualizer.create_comparison_plots(comparison_path)
-
-        # 生成差异分析表
-        gap_analysis_path = os.path.join(app.config['RESULT_FOLDER'], f'gap_analysis_{timestamp}.xlsx')
-        gap_analyzer = GapAnalyzer(schedule_path, po_path, result_path)
-        gap_analyzer.export_to_excel(gap_analysis_path, highlight_top_percent=30)
-
-        # 生成差异统计和表格数据
-        gap_stats = gap_analyzer.generate_summary_stats()
-        gap_data = gap_analyzer.create_gap_table()
-
-        # 转换gap数据为JSON格式（按周维度）
-        gap_json = {
-            'skus': gap_data['gap'].index.tolist(),
-            'weeks': gap_data['week_labels'],  # 使用周次标签（如 2025W50）
-            'gap_values': gap_data['gap'].values.tolist(),
-            'schedule_values': gap_data['schedule'].values.tolist(),
-            'po_values': gap_data['po'].values.tolist(),
-            'stats': gap_stats
-        }
-
-        # 准备返回数据
-        summary_data = summary.to_dict('records')
+        job = jobs.submit(lambda job: run_optimization_job(job, job_params, workspace), job_params)
 
         return jsonify({
             'success': True,
-            'message': '优化完成',
-            'data': {
-                'timestamp': timestamp,
-                'summary': summary_data,
-                'gap_analysis': gap_json,
-                'files': {
-                    'optimized_po': f'po_optimized_{timestamp}.xlsx',
-                    'report': f'report_{timestamp}.xlsx',
-                    'comparison_chart': f'comparison_{timestamp}.png',
-                    'gap_analysis': f'gap_analysis_{timestamp}.xlsx'
-                }
-            }
-        })
+            'message': '优化任务已提交',
+            'data': job.to_dict()
+        }), 202
 
     except Exception as e:
         traceback.print_exc()
         return jsonify({'success': False, 'error': f'优化失败: {str(e)}'}), 500
 
 
-@app.route('/api/download/<filename>')
-def download_file(filename):
-    """下载结果文件"""
+@app.route('/api/optimize/stream')
+def optimize_stream():
+    """以Server-Sent Events推送任务的进度事件，任务结束后发送end事件并关闭"""
+    job = jobs.get(request.args.get('job_id', ''))
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+
+    # 断线重连时从上次收到的事件之后继续
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', request.args.get('last_event_id', 0)))
+    except ValueError:
+        last_event_id = 0
+
+    def generate():
+        seq = last_event_id
+        while True:
+            events = job.wait_events(seq, timeout=SSE_KEEPALIVE)
+            for seq, event in events:
+                yield f"id: {seq}\nevent: {event['type']}\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
+            if events:
+                continue
+            if job.finished:
+                yield f"event: end\ndata: {json.dumps(job.to_dict(), ensure_ascii=False)}\n\n"
+                return
+            yield ": keep-alive\n\n"
+
+    return Response(stream_with_context(generate()), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+@app.route('/api/jobs/<job_id>')
+def job_status(job_id):
+    """查询任务状态和进度"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+
+    return jsonify({'success': True, 'data': job.to_dict()})
+
+
+@app.route('/api/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """取消任务"""
+    job = jobs.cancel(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+
+    return jsonify({'success': True, 'message': '已请求取消任务', 'data': job.to_dict()})
+
+
+@app.route('/api/jobs/<job_id>/result')
+def job_result(job_id):
+    """获取已完成任务的优化结果"""
+    job = jobs.get(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': '任务不存在'}), 404
+
+    if job.status == 'done':
+        return jsonify({'success': True, 'message': '优化完成', 'data': job.result})
+    if job.status == 'failed':
+        return jsonify({'success': False, 'error': f'优化失败: {job.error}'}), 500
+    if job.status == 'cancelled':
+        return jsonify({'success': False, 'error': '任务已取消'}), 409
+    return jsonify({'success': False, 'error': '任务尚未完成', 'data': job.to_dict()}), 409
+
+
+@functools.lru_cache(maxsize=16)
+def load_gap_matrix(path):
+    """读取差异矩阵文件（文件写入后不再修改，按路径缓存最近使用的矩阵）"""
+    return GapMatrix.load(path)
+
+
+@app.route('/api/gap/<workspace_id>/<result_id>')
+def gap_page(workspace_id, result_id):
+    """
+    分页获取差异矩阵
+
+    查询参数: offset、limit（行分页）、week_start、week_end（周次列区间，含起不含止）、
+    sort（weighted / abs / gap / sku）、order（desc / asc）、q（SKU筛选）
+    """
+    workspace = workspaces.get(workspace_id)
+    path = workspace.output_file(f'gap_matrix_{result_id}.npz') if workspace is not None else None
+    if path is None:
+        return jsonify({'success': False, 'error': '差异分析结果不存在'}), 404
+
+    try:
+        args = request.args
+        week_end = args.get('week_end', type=int)
+        page = load_gap_matrix(path).page(offset=args.get('offset', 0, type=int),
+                                          limit=args.get('limit', 100, type=int),
+                                          week_start=args.get('week_start', 0, type=int),
+                                          week_end=week_end,
+                                          sort=args.get('sort', 'weighted'),
+                                          descending=args.get('order', 'desc') != 'asc',
+                                          query=args.get('q', '').strip() or None)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+
+    return jsonify({'success': True, 'data': page})
+
+
+@app.route('/api/download/<workspace_id>/<filename>')
+def download_file(workspace_id, filename):
+    """下载工作区中的结果文件"""
     try:
-        file_path = os.path.join(app.config['RESULT_FOLDER'], filename)
-        if not os.path.exists(file_path):
+        workspace = workspaces.get(workspace_id)
+        file_path = workspace.output_file(filename) if workspace is not None else None
+        if file_path is None:
             return jsonify({'success': False, 'error': '文件不存在'}), 404
 
         return send_file(file_path, as_attachment=True, download_name=filename)
@@ -267,12 +410,13 @@ def download_file(filename):
         return jsonify({'success': False, 'error': f'下载失败: {str(e)}'}), 500
 
 
-@app.route('/api/preview/<filename>')
-def preview_file(filename):
-    """预览图片文件"""
+@app.route('/api/preview/<workspace_id>/<filename>')
+def preview_file(workspace_id, filename):
+    """预览工作区中的图片文件"""
     try:
-        file_path = os.path.join(app.config['RESULT_FOLDER'], filename)
-        if not os.path.exists(file_path):
+        workspace = workspaces.get(workspace_id)
+        file_path = workspace.output_file(filename) if workspace is not None else None
+        if file_path is None:
             return jsonify({'success': False, 'error': '文件不存在'}), 404
 
         return send_file(file_path, mimetype='image/png')
@@ -282,20 +426,23 @@ def preview_file(filename):
 
 @app.route('/api/status')
 def status():
-    """获取系统状态"""
-    schedule_path = os.path.join(app.config['UPLOAD_FOLDER'], 'schedule_aim.xlsx')
-    po_path = os.path.join(app.config['UPLOAD_FOLDER'], 'po_lists.xlsx')
+    """获取系统状态（指定workspace_id时包含该工作区的上传状态）"""
+    workspace = workspaces.get(request.args.get('workspace_id'))
 
     return jsonify({
         'success': True,
         'data': {
-            'schedule_uploaded': os.path.exists(schedule_path),
-            'po_uploaded': os.path.exists(po_path),
-            'upload_folder': app.config['UPLOAD_FOLDER'],
-            'result_folder': app.config['RESULT_FOLDER']
+            'workspace_id': workspace.id if workspace is not None else None,
+            'schedule_uploaded': workspace is not None and os.path.exists(workspace.schedule_path),
+            'po_uploaded': workspace is not None and os.path.exists(workspace.po_path),
+            'workspace_folder': app.config['WORKSPACE_FOLDER'],
+            'max_concurrent_jobs': jobs.max_workers
         }
     })
 
 
 if __name__ == '__main__':
+    # debug模式下由重载器启动的子进程处理请求，只在该进程中预热进程池
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        worker_pool.start()
     app.run(debug=True, host='0.0.0.0', port=5001)
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+后台任务队列 - 优化任务在后台线程中执行，前端按任务ID轮询进度或订阅进度事件、取消和获取结果
+"""
+
+import time
+import uuid
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from src.core.po_adjustment import OptimizationCancelled
+
+
+class Job:
+    """
+    单个后台任务
+
+    状态: queued（排队中） -> running（执行中） -> done / failed / cancelled
+    """
+
+    FINISHED = ('done', 'failed', 'cancelled')
+
+    # 每个任务保留的最近事件数（订阅方落后过多时只能收到保留的部分）
+    MAX_EVENTS = 2000
+
+    def __init__(self, job_id: str, params: dict):
+        """
+        初始化任务
+
+        Args:
+            job_id: 任务ID
+            params: 任务参数（原样返回给前端）
+        """
+        self.id = job_id
+        self.params = params
+        self.status = 'queued'
+        self.progress = {'stage': 'queued', 'done': 0, 'total': 0, 'sku': None, 'message': '排队中'}
+        self.result = None
+        self.error = None
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancel_event = threading.Event()
+        self.future = None
+        self.events = deque(maxlen=self.MAX_EVENTS)
+        self._event_seq = 0
+        self._lock = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        """任务是否已结束"""
+        return self.status in self.FINISHED
+
+    def update_progress(self, stage: str, message: str, done: int = None, total: int = None, sku=None):
+        """
+        更新任务进度
+
+        Args:
+            stage: 当前阶段（loading / optimizing / reporting）
+            message: 进度说明
+            done: 已完成的SKU数（optimizing阶段）
+            total: SKU总数（optimizing阶段）
+            sku: 刚完成的SKU
+        """
+        with self._lock:
+            self.progress = {
+                'stage': stage,
+                'done': self.progress['done'] if done is None else done,
+                'total': self.progress['total'] if total is None else total,
+                'sku': sku,
+                'message': message
+            }
+            self._append_event(dict(self.progress, type='progress'))
+
+    def emit(self, event: dict):
+        """
+        记录一个进度事件（优化器事件或阶段变化），唤醒等待中的订阅方
+
+        Args:
+            event: 带'type'键的事件字典（可序列化为JSON）
+        """
+        with self._lock:
+            self._append_event(event)
+
+    def _append_event(self, event: dict):
+        """追加事件（调用方须持有锁）"""
+        self._event_seq += 1
+        self.events.append((self._event_seq, event))
+        self._lock.notify_all()
+
+    def wait_events(self, after: int, timeout: float = None) -> list:
+        """
+        获取序号大于after的事件，暂无新事件且任务未结束时最多等待timeout秒
+
+        Args:
+            after: 已收到的最后一个事件序号
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            [(序号, 事件)]，任务已结束且没有新事件时返回空列表
+        """
+        with self._lock:
+            self._lock.wait_for(lambda: self._event_seq > after or self.finished, timeout=timeout)
+            return [(seq, event) for seq, event in self.events if seq > after]
+
+    def finish(self, status: str, message: str, error: str = None):
+        """
+        结束任务：先记录最终进度事件，再设置状态，保证订阅方在结束前收到全部事件
+
+        Args:
+            status: done / failed / cancelled
+            message: 最终进度说明
+            error: 失败原因
+        """
+        with self._lock:
+            self.update_progress(status, message, sku=self.progress['sku'])
+            self.error = error
+            self.status = status
+            self.finished_at = time.time()
+            self._lock.notify_all()
+
+    def check_cancelled(self):
+        """任务已被取消时抛出OptimizationCancelled（在各阶段之间调用）"""
+        if self.cancel_event.is_set():
+            raise OptimizationCancelled("任务已取消")
+
+    def to_dict(self) -> dict:
+        """任务状态（不含结果数据）"""
+        with self._lock:
+            progress = dict(self.progress)
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'progress': progress,
+            'error': self.error,
+            'params': self.params,
+            'created_at': self.created_at,
+            'started_at': self.started_at,
+            'finished_at': self.finished_at
+        }
+
+
+class JobManager:
+    """
+    后台任务管理器
+
+    任务按提交顺序在工作线程中执行，最多同时执行max_workers个，其余排队；
+    已结束的任务只保留最近max_finished个。
+    """
+
+    def __init__(self, max_workers: int = 1, max_finished: int = 100):
+        """
+        初始化任务管理器
+
+        Args:
+            max_workers: 同时执行的任务数
+            max_finished: 保留的已结束任务数
+        """
+        self.max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='optimize-job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.max_finished = max_finished
+
+    def submit(self, func, params: dict) -> Job:
+        """
+        提交任务
+
+        Args:
+            func: 任务函数 func(job)，返回结果数据；可调用job.update_progress和job.check_cancelled
+            params: 任务参数
+
+        Returns:
+            Job
+        """
+        job = Job(uuid.uuid4().hex, params)
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+        job.future = self._executor.submit(self._run, job, func)
+        return job
+
+    def _run(self, job: Job, func):
+        """在工作线程中执行任务并记录结果"""
+        if job.cancel_event.is_set():
+            job.finish('cancelled', '任务已取消')
+            return
+
+        job.status = 'running'
+        job.started_at = time.time()
+        try:
+            job.result = func(job)
+            job.finish('done', '✅ 优化完成！')
+        except OptimizationCancelled:
+            job.finish('cancelled', '任务已取消')
+        except Exception as e:
+            traceback.print_exc()
+            job.finish('failed', f'❌ 优化失败: {e}', error=str(e))
+
+    def _prune(self):
+        """删除最早结束的任务，只保留最近max_finished个"""
+        finished = sorted((job for job in self._jobs.values() if job.finished),
+                          key=lambda job: job.finished_at)
+        for job in finished[:max(len(finished) - self.max_finished, 0)]:
+            del self._jobs[job.id]
+
+    def get(self, job_id: str) -> Job:
+        """
+        获取任务
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Job，不存在时返回None
+        """
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def active(self, **params) -> list:
+        """
+        获取尚未结束（排队中或执行中）的任务
+
+        Args:
+            params: 按任务参数筛选（如workspace_id=...），全部相等的任务才返回
+
+        Returns:
+            [Job]
+        """
+        with self._lock:
+            return [job for job in self._jobs.values()
+                    if not job.finished and all(job.params.get(key) == value for key, value in params.items())]
+
+    def cancel(self, job_id: str) -> Job:
+        """
+        取消任务：排队中的任务直接取消，执行中的任务在下一个检查点停止
+
+        Args:
+            job_id: 任务ID
+
+        Returns:
+            Job，不存在时返回None
+        """
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.cancel_event.set()
+        if job.future is not None and job.future.cancel():
+            job.finish('cancelled', '任务已取消')
+        return job
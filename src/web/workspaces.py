@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+工作区管理 - 每次上传创建独立的工作区，输入文件、解析缓存和结果文件按工作区隔离，
+多个用户同时使用时互不覆盖
+"""
+
+import os
+import re
+import time
+import uuid
+import shutil
+import threading
+
+from werkzeug.utils import safe_join
+
+
+class Workspace:
+    """
+    单个工作区（目录结构: <root>/<id>/uploads、output、cache）
+    """
+
+    SCHEDULE_FILE = 'schedule_aim.xlsx'
+    PO_FILE = 'po_lists.xlsx'
+
+    def __init__(self, root: str, workspace_id: str):
+        """
+        初始化工作区
+
+        Args:
+            root: 工作区根目录
+            workspace_id: 工作区ID
+        """
+        self.id = workspace_id
+        self.path = os.path.join(root, workspace_id)
+        self.upload_dir = os.path.join(self.path, 'uploads')
+        self.output_dir = os.path.join(self.path, 'output')
+        self.cache_dir = os.path.join(self.path, 'cache')
+
+    @property
+    def schedule_path(self) -> str:
+        """排程目标文件路径"""
+        return os.path.join(self.upload_dir, self.SCHEDULE_FILE)
+
+    @property
+    def po_path(self) -> str:
+        """PO清单文件路径"""
+        return os.path.join(self.upload_dir, self.PO_FILE)
+
+    @property
+    def has_inputs(self) -> bool:
+        """两个输入文件是否都已上传"""
+        return os.path.exists(self.schedule_path) and os.path.exists(self.po_path)
+
+    def output_file(self, filename: str) -> str:
+        """
+        结果文件路径
+
+        Args:
+            filename: 文件名
+
+        Returns:
+            文件路径，文件名不合法（含路径分隔符等）或文件不存在时返回None
+        """
+        path = safe_join(self.output_dir, filename)
+        return path if path is not None and os.path.isfile(path) else None
+
+    def touch(self):
+        """更新最后使用时间（过期清理以此为准）"""
+        os.utime(self.path)
+
+
+class WorkspaceManager:
+    """
+    工作区管理器
+
+    工作区ID为随机生成的十六进制字符串，只接受该格式的ID，避免路径穿越；
+    超过ttl未使用的工作区在创建新工作区时删除。
+    """
+
+    ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, root: str, ttl: float = 24 * 3600):
+        """
+        初始化工作区管理器
+
+        Args:
+            root: 工作区根目录
+            ttl: 工作区保留时间（秒），None表示不清理
+        """
+        self.root = root
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        os.makedirs(root, exist_ok=True)
+
+    def create(self) -> Workspace:
+        """
+        创建新工作区（同时清理过期工作区）
+
+        Returns:
+            Workspace
+        """
+        self._prune()
+        workspace = Workspace(self.root, uuid.uuid4().hex)
+        for directory in (workspace.upload_dir, workspace.output_dir, workspace.cache_dir):
+            os.makedirs(directory, exist_ok=True)
+        return workspace
+
+    def get(self, workspace_id: str) -> Workspace:
+        """
+        获取工作区
+
+        Args:
+            workspace_id: 工作区ID
+
+        Returns:
+            Workspace，ID不合法或工作区不存在时返回None
+        """
+        if not workspace_id or not self.ID_PATTERN.match(workspace_id):
+            return None
+        workspace = Workspace(self.root, workspace_id)
+        return workspace if os.path.isdir(workspace.path) else None
+
+    def _prune(self):
+        """删除超过ttl未使用的工作区"""
+        if self.ttl is None:
+            return
+        expire_before = time.time() - self.ttl
+        with self._lock:
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                try:
+                    if self.ID_PATTERN.match(name) and os.path.getmtime(path) < expire_before:
+                        shutil.rmtree(path)
+                except OSError as e:
+                    print(f"警告: 清理工作区 {name} 失败: {e}")
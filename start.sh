@@ -11,11 +11,11 @@ echo "================================"
 export PYTHONUNBUFFERED=1
 export PORT=${PORT:-5001}
 export HOST=${HOST:-0.0.0.0}
-export WORKERS=${WORKERS:-2}
+export THREADS=${THREADS:-16}
 
 # 创建必要的目录
 echo "创建数据目录..."
-mkdir -p data/output data/uploads
+mkdir -p data/output data/workspaces
 
 # 检查依赖
 echo "检查 Python 环境..."
@@ -24,13 +24,13 @@ python --version
 # 启动服务
 echo "启动 Web 服务..."
 echo "监听地址: ${HOST}:${PORT}"
-echo "Worker 数量: ${WORKERS}"
+echo "线程数: ${THREADS}"
 
-# 使用 gunicorn 启动
+# 使用 gunicorn 启动：单个 gthread 工作进程（后台任务和进度事件保存在进程内存中，
+# 工作进程数、线程数和超时见 gunicorn.conf.py）
 exec gunicorn \
+    --config gunicorn.conf.py \
     --bind "${HOST}:${PORT}" \
-    --workers "${WORKERS}" \
-    --timeout 120 \
     --access-logfile - \
     --error-logfile - \
     --log-level info \
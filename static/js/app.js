@@ -3,7 +3,9 @@ let appState = {
     scheduleFile: null,
     poFile: null,
     currentStep: 1,
-    optimizationResult: null
+    optimizationResult: null,
+    jobId: null,
+    workspaceId: null
 };
 
 // 初始化
@@ -140,6 +142,10 @@ function uploadFiles() {
     const formData = new FormData();
     formData.append('schedule_aim', appState.scheduleFile);
     formData.append('po_lists', appState.poFile);
+    // 重新上传时沿用当前工作区
+    if (appState.workspaceId) {
+        formData.append('workspace_id', appState.workspaceId);
+    }
 
     const uploadBtn = document.getElementById('btn-upload');
     uploadBtn.disabled = true;
@@ -158,6 +164,8 @@ function uploadFiles() {
         uploadBtn.textContent = '上传并预览';
 
         if (data.success) {
+            appState.workspaceId = data.data.workspace_id;
+
             // 显示转换信息
             if (data.data.conversion) {
                 if (data.data.conversion.converted) {
@@ -312,53 +320,29 @@ function goToStep(step) {
     appState.currentStep = step;
 }
 
-// 开始优化
+// 进度轮询间隔（毫秒）
+const JOB_POLL_INTERVAL = 1000;
+
+// 开始优化：提交后台任务，按任务ID轮询真实进度
 function startOptimization() {
     const params = {
         priority_weeks: parseInt(document.getElementById('priority-weeks').value),
         priority_weight: parseFloat(document.getElementById('priority-weight').value),
         date_weight: 0.0,  // 固定为0，不考虑日期接近度
-        max_workers: parseInt(document.getElementById('max-workers').value)
+        max_workers: parseInt(document.getElementById('max-workers').value),
+        workspace_id: appState.workspaceId
     };
 
     // 显示进度条
     const progressPanel = document.getElementById('progress-panel');
-    const progressFill = document.getElementById('progress-fill');
-    const progressText = document.getElementById('progress-text');
     const optimizeBtn = document.getElementById('btn-optimize');
 
     progressPanel.style.display = 'block';
     optimizeBtn.disabled = true;
     optimizeBtn.classList.add('loading');
+    updateProgress(0, '🔄 正在提交优化任务...');
 
-    const statusMessages = [
-        '🔄 正在初始化优化引擎...',
-        '📊 正在加载数据文件...',
-        '🔍 正在分析SKU数据...',
-        '⚡ 正在执行优化算法...',
-        '📈 正在计算最优方案...',
-        '🎨 正在生成可视化图表...'
-    ];
-    let messageIndex = 0;
-
-    progressText.textContent = statusMessages[0];
-
-    // 模拟进度更新
-    let progress = 0;
-    const progressInterval = setInterval(() => {
-        progress += Math.random() * 10 + 5;
-        if (progress > 90) progress = 90;
-        progressFill.style.width = progress + '%';
-        progressFill.textContent = Math.floor(progress) + '%';
-
-        // 更新状态消息
-        if (progress > messageIndex * 15 && messageIndex < statusMessages.length - 1) {
-            messageIndex++;
-            progressText.textContent = statusMessages[messageIndex];
-        }
-    }, 500);
-
-    // 发送优化请求
+    // 提交优化任务
     fetch('/api/optimize', {
         method: 'POST',
         headers: {
@@ -368,11 +352,121 @@ function startOptimization() {
     })
     .then(response => response.json())
     .then(data => {
-        clearInterval(progressInterval);
-        progressFill.style.width = '100%';
-        progressFill.textContent = '100%';
-        progressText.textContent = '✅ 优化完成！';
-        optimizeBtn.classList.remove('loading');
+        if (data.success) {
+            appState.jobId = data.data.job_id;
+            document.getElementById('btn-cancel').style.display = 'inline-block';
+            watchJob(data.data.job_id);
+        } else {
+            resetOptimization();
+            showToast('❌ ' + (data.error || '优化失败'), 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Optimization error:', error);
+        resetOptimization();
+        showToast('❌ 优化失败: ' + error.message, 'error');
+    });
+}
+
+// 更新进度条
+function updateProgress(percent, message) {
+    const progressFill = document.getElementById('progress-fill');
+    progressFill.style.width = percent + '%';
+    progressFill.textContent = Math.floor(percent) + '%';
+    document.getElementById('progress-text').textContent = message;
+}
+
+// 任务进度 -> 百分比：加载5%，SKU优化占5%~85%，报告生成占85%~99%
+function jobPercent(job) {
+    const progress = job.progress;
+    if (job.status === 'done' || progress.stage === 'done') return 100;
+    if (progress.stage === 'loading' || progress.stage === 'queued') return 5;
+    if (progress.stage === 'optimizing') {
+        return progress.total > 0 ? 5 + 80 * progress.done / progress.total : 5;
+    }
+    if (progress.stage === 'reporting') return 90;
+    return 0;
+}
+
+// 跟踪任务进度：优先订阅服务端推送的进度事件，不支持或连接失败时改为轮询
+function watchJob(jobId) {
+    if (!window.EventSource) {
+        pollJob(jobId);
+        return;
+    }
+
+    const source = new EventSource(`/api/optimize/stream?job_id=${jobId}`);
+
+    source.addEventListener('progress', event => {
+        const progress = JSON.parse(event.data);
+        updateProgress(jobPercent({status: 'running', progress: progress}), progress.message);
+    });
+
+    source.addEventListener('local_search_move', event => {
+        const move = JSON.parse(event.data);
+        document.getElementById('progress-text').textContent =
+            `⚡ SKU ${move.sku}: PO#${move.po} ${move.from_week} → ${move.to_week}（第${move.iteration}次调整）`;
+    });
+
+    source.addEventListener('end', event => {
+        source.close();
+        handleJobFinished(JSON.parse(event.data));
+    });
+
+    source.onerror = () => {
+        source.close();
+        pollJob(jobId);
+    };
+}
+
+// 任务结束后的处理
+function handleJobFinished(job) {
+    if (job.status === 'done') {
+        updateProgress(100, job.progress.message);
+        fetchJobResult(job.job_id);
+    } else if (job.status === 'failed') {
+        resetOptimization();
+        showToast('❌ 优化失败: ' + job.error, 'error');
+    } else if (job.status === 'cancelled') {
+        resetOptimization();
+        showToast('已取消优化任务', 'info');
+    }
+}
+
+// 轮询任务状态
+function pollJob(jobId) {
+    fetch(`/api/jobs/${jobId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (!data.success) {
+            resetOptimization();
+            showToast('❌ ' + (data.error || '任务不存在'), 'error');
+            return;
+        }
+
+        const job = data.data;
+        updateProgress(jobPercent(job), job.progress.message);
+
+        if (['done', 'failed', 'cancelled'].includes(job.status)) {
+            handleJobFinished(job);
+        } else {
+            setTimeout(() => pollJob(jobId), JOB_POLL_INTERVAL);
+        }
+    })
+    .catch(error => {
+        console.error('Poll error:', error);
+        setTimeout(() => pollJob(jobId), JOB_POLL_INTERVAL);
+    });
+}
+
+// 获取任务结果并显示
+function fetchJobResult(jobId) {
+    fetch(`/api/jobs/${jobId}/result`)
+    .then(response => response.json())
+    .then(data => {
+        document.getElementById('btn-optimize').classList.remove('loading');
+        document.getElementById('btn-cancel').style.display = 'none';
+        appState.jobId = null;
 
         if (data.success) {
             showToast('🎉 优化成功完成！', 'success');
@@ -382,24 +476,59 @@ function startOptimization() {
                 goToStep(4);
             }, 1500);
         } else {
+            resetOptimization();
             showToast('❌ ' + (data.error || '优化失败'), 'error');
-            optimizeBtn.disabled = false;
-            progressPanel.style.display = 'none';
         }
     })
     .catch(error => {
-        clearInterval(progressInterval);
-        console.error('Optimization error:', error);
-        showToast('❌ 优化失败: ' + error.message, 'error');
-        optimizeBtn.disabled = false;
-        optimizeBtn.classList.remove('loading');
-        progressPanel.style.display = 'none';
+        console.error('Result error:', error);
+        resetOptimization();
+        showToast('❌ 获取结果失败: ' + error.message, 'error');
+    });
+}
+
+// 取消优化任务
+function cancelOptimization() {
+    if (!appState.jobId) return;
+
+    const cancelBtn = document.getElementById('btn-cancel');
+    cancelBtn.disabled = true;
+
+    fetch(`/api/jobs/${appState.jobId}/cancel`, { method: 'POST' })
+    .then(response => response.json())
+    .then(data => {
+        if (data.success) {
+            updateProgress(jobPercent(data.data), '⏹ 正在取消...');
+        } else {
+            showToast('❌ ' + (data.error || '取消失败'), 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Cancel error:', error);
+        showToast('❌ 取消失败: ' + error.message, 'error');
     });
 }
 
+// 恢复优化前的状态
+function resetOptimization() {
+    const optimizeBtn = document.getElementById('btn-optimize');
+    const cancelBtn = document.getElementById('btn-cancel');
+    optimizeBtn.disabled = false;
+    optimizeBtn.classList.remove('loading');
+    cancelBtn.style.display = 'none';
+    cancelBtn.disabled = false;
+    document.getElementById('progress-panel').style.display = 'none';
+    appState.jobId = null;
+}
+
 // 全局变量保存gap分析文件名
 let currentGapAnalysisFile = '';
 
+// 当前工作区中结果文件的下载或预览地址
+function resultFileUrl(action, filename) {
+    return `/api/${action}/${appState.workspaceId}/${filename}`;
+}
+
 // 显示结果
 function displayResults(data) {
     // 1. 首先显示差异分析表
@@ -459,18 +588,18 @@ function displayResults(data) {
 
     // 显示图表
     const comparisonChart = document.getElementById('comparison-chart');
-    comparisonChart.src = `/api/preview/${data.files.comparison_chart}`;
+    comparisonChart.src = resultFileUrl('preview', data.files.comparison_chart);
 
     // 显示下载按钮
     const downloadDiv = document.getElementById('download-buttons');
     downloadDiv.innerHTML = `
-        <a href="/api/download/${data.files.optimized_po}" class="btn btn-download slide-in-up" style="animation-delay: 0.1s;" download>
+        <a href="${resultFileUrl('download', data.files.optimized_po)}" class="btn btn-download slide-in-up" style="animation-delay: 0.1s;" download>
             📄 优化后PO清单
         </a>
-        <a href="/api/download/${data.files.report}" class="btn btn-download slide-in-up" style="animation-delay: 0.2s;" download>
+        <a href="${resultFileUrl('download', data.files.report)}" class="btn btn-download slide-in-up" style="animation-delay: 0.2s;" download>
             📊 详细对比报告
         </a>
-        <a href="/api/download/${data.files.comparison_chart}" class="btn btn-download slide-in-up" style="animation-delay: 0.3s;" download>
+        <a href="${resultFileUrl('download', data.files.comparison_chart)}" class="btn btn-download slide-in-up" style="animation-delay: 0.3s;" download>
             📈 数量对比图
         </a>
     `;
@@ -537,87 +666,201 @@ function displayGapAnalysis(gapData) {
         </div>
     `;
 
-    // 生成差异表格（按周维度）
-    const tableDiv = document.getElementById('gap-table');
-    const skus = gapData.skus;
-    const weeks = gapData.weeks;  // 周次标签（如 2025W50）
-    const gapValues = gapData.gap_values;
-    const scheduleValues = gapData.schedule_values;
-    const poValues = gapData.po_values;
-
-    // 计算top30%阈值
-    const allGaps = gapValues.flat().map(Math.abs).filter(v => v > 0);
-    const threshold = calculatePercentile(allGaps, 70);
-
-    // 构建表格HTML
-    let tableHTML = '<thead>';
-
-    // 第一行：分类标题
-    tableHTML += '<tr>';
-    tableHTML += '<th rowspan="2" class="sku-header">SKU</th>';
-    tableHTML += `<th colspan="${weeks.length}" class="section-header">GAP差异</th>`;
-    tableHTML += `<th colspan="${weeks.length}" class="section-header">排程目标</th>`;
-    tableHTML += `<th colspan="${weeks.length}" class="section-header">PO汇总结果</th>`;
-    tableHTML += '</tr>';
-
-    // 第二行：周次
-    tableHTML += '<tr>';
-    for (let i = 0; i < 3; i++) {
-        for (const week of weeks) {
-            tableHTML += `<th>${week}</th>`;
-        }
+    // 差异表格按需分页加载：只请求并渲染滚动区域内可见的行
+    gapView.resultId = gapData.result_id;
+    gapView.weeks = gapData.weeks;
+    gapView.threshold = gapData.highlight_threshold;
+
+    const weekStart = document.getElementById('gap-week-start');
+    const weekEnd = document.getElementById('gap-week-end');
+    weekStart.innerHTML = gapData.weeks.map((week, j) => `<option value="${j}">${week}</option>`).join('');
+    weekEnd.innerHTML = gapData.weeks.map((week, j) => `<option value="${j + 1}">${week}</option>`).join('');
+    weekStart.value = 0;
+    weekEnd.value = gapData.weeks.length;
+
+    const container = document.getElementById('gap-table-container');
+    if (!gapView.scrollBound) {
+        container.addEventListener('scroll', () => {
+            if (!gapView.renderQueued) {
+                gapView.renderQueued = true;
+                window.requestAnimationFrame(() => {
+                    gapView.renderQueued = false;
+                    renderGapRows();
+                });
+            }
+        });
+        gapView.scrollBound = true;
     }
-    tableHTML += '</tr>';
-    tableHTML += '</thead>';
 
-    // 数据行
-    tableHTML += '<tbody>';
-    for (let i = 0; i < skus.length; i++) {
-        tableHTML += '<tr>';
+    reloadGapTable();
+}
 
-        // SKU列
-        tableHTML += `<td class="sku-cell">${skus[i]}</td>`;
+// 差异表格的虚拟滚动参数
+const GAP_PAGE_SIZE = 100;
+const GAP_ROW_HEIGHT = 40;  // 与style.css中.gap-table tbody tr的高度一致
+const GAP_OVERSCAN = 10;    // 可见区域上下额外渲染的行数
+
+// 差异表格状态：查询条件变化时version递增，丢弃旧查询的响应
+let gapView = {
+    resultId: null,
+    weeks: [],
+    threshold: 0,
+    query: null,
+    total: 0,
+    pages: new Map(),
+    loading: new Set(),
+    version: 0,
+    scrollBound: false,
+    renderQueued: false
+};
 
-        // GAP差异列
-        for (let j = 0; j < weeks.length; j++) {
-            const value = gapValues[i][j];
-            let className = 'gap-column ' + (value > 0 ? 'positive' : (value < 0 ? 'negative' : 'zero'));
+let gapQueryTimer = null;
 
-            // 高亮top30%
-            if (Math.abs(value) >= threshold && Math.abs(value) > 0) {
-                className += ' highlight';
-            }
+// SKU筛选输入停顿后再重新加载
+function scheduleGapReload() {
+    clearTimeout(gapQueryTimer);
+    gapQueryTimer = setTimeout(reloadGapTable, 300);
+}
 
-            tableHTML += `<td class="${className}">${value.toLocaleString()}</td>`;
-        }
+// 按当前排序、周次区间和筛选条件重新加载差异表格
+function reloadGapTable() {
+    const weekStart = parseInt(document.getElementById('gap-week-start').value) || 0;
+    let weekEnd = parseInt(document.getElementById('gap-week-end').value) || gapView.weeks.length;
+    if (weekEnd <= weekStart) {
+        weekEnd = weekStart + 1;
+        document.getElementById('gap-week-end').value = weekEnd;
+    }
 
-        // 排程目标列
-        for (let j = 0; j < weeks.length; j++) {
-            const value = scheduleValues[i][j];
-            tableHTML += `<td class="schedule-column">${value.toLocaleString()}</td>`;
-        }
+    gapView.query = {
+        sort: document.getElementById('gap-sort').value,
+        order: document.getElementById('gap-order').value,
+        q: document.getElementById('gap-query').value.trim(),
+        week_start: weekStart,
+        week_end: weekEnd
+    };
+    gapView.version += 1;
+    gapView.total = 0;
+    gapView.pages = new Map();
+    gapView.loading = new Set();
+
+    renderGapHeader();
+    document.getElementById('gap-table-container').scrollTop = 0;
+    loadGapPage(0);
+}
+
+// 请求一页差异数据（已加载或正在加载的页跳过）
+function loadGapPage(pageIndex) {
+    if (gapView.pages.has(pageIndex) || gapView.loading.has(pageIndex)) return;
+    gapView.loading.add(pageIndex);
 
-        // PO汇总结果列
-        for (let j = 0; j < weeks.length; j++) {
-            const value = poValues[i][j];
-            tableHTML += `<td class="po-column">${value.toLocaleString()}</td>`;
+    const version = gapView.version;
+    const query = new URLSearchParams({
+        ...gapView.query,
+        offset: pageIndex * GAP_PAGE_SIZE,
+        limit: GAP_PAGE_SIZE
+    });
+
+    fetch(`/api/gap/${appState.workspaceId}/${gapView.resultId}?${query}`)
+    .then(response => response.json())
+    .then(data => {
+        if (version !== gapView.version) return;
+        gapView.loading.delete(pageIndex);
+        if (!data.success) {
+            showToast(data.error || '差异数据加载失败', 'error');
+            return;
         }
+        gapView.pages.set(pageIndex, data.data);
+        gapView.total = data.data.total;
+        document.getElementById('gap-row-count').textContent = `共 ${data.data.total} 个SKU`;
+        renderGapRows();
+    })
+    .catch(error => {
+        if (version !== gapView.version) return;
+        gapView.loading.delete(pageIndex);
+        showToast('差异数据加载失败: ' + error.message, 'error');
+    });
+}
 
-        tableHTML += '</tr>';
+// 表头（按当前周次区间）
+function renderGapHeader() {
+    const weeks = gapView.weeks.slice(gapView.query.week_start, gapView.query.week_end);
+    const weekHeaders = weeks.map(week => `<th>${week}</th>`).join('');
+
+    document.getElementById('gap-table').innerHTML = `
+        <thead>
+            <tr>
+                <th rowspan="2" class="sku-header">SKU</th>
+                <th rowspan="2">加权差异</th>
+                <th colspan="${weeks.length}" class="section-header">GAP差异</th>
+                <th colspan="${weeks.length}" class="section-header">排程目标</th>
+                <th colspan="${weeks.length}" class="section-header">PO汇总结果</th>
+            </tr>
+            <tr>${weekHeaders}${weekHeaders}${weekHeaders}</tr>
+        </thead>
+        <tbody></tbody>
+    `;
+}
+
+// 只渲染可见区域的行，上下用占位行撑开滚动高度；未加载的页先显示占位并发起请求
+function renderGapRows() {
+    const container = document.getElementById('gap-table-container');
+    const tbody = document.querySelector('#gap-table tbody');
+    if (!tbody) return;
+
+    const weekCount = gapView.query.week_end - gapView.query.week_start;
+    const columnCount = 2 + weekCount * 3;
+    const total = gapView.total;
+    const first = Math.max(0, Math.floor(container.scrollTop / GAP_ROW_HEIGHT) - GAP_OVERSCAN);
+    const last = Math.min(total, first + Math.ceil(container.clientHeight / GAP_ROW_HEIGHT) + GAP_OVERSCAN * 2);
+
+    let rowsHTML = spacerRow(first * GAP_ROW_HEIGHT, columnCount);
+    for (let i = first; i < last; i++) {
+        const pageIndex = Math.floor(i / GAP_PAGE_SIZE);
+        const page = gapView.pages.get(pageIndex);
+        if (!page) {
+            loadGapPage(pageIndex);
+            rowsHTML += `<tr><td class="loading" colspan="${columnCount}">加载中...</td></tr>`;
+            continue;
+        }
+        rowsHTML += gapRow(page, i - pageIndex * GAP_PAGE_SIZE, weekCount);
     }
-    tableHTML += '</tbody>';
+    rowsHTML += spacerRow((total - last) * GAP_ROW_HEIGHT, columnCount);
 
-    tableDiv.innerHTML = tableHTML;
+    tbody.innerHTML = rowsHTML;
 }
 
-// 计算百分位数
-function calculatePercentile(arr, percentile) {
-    if (arr.length === 0) return 0;
+// 占位行
+function spacerRow(height, columnCount) {
+    return height > 0 ? `<tr class="gap-spacer" style="height: ${height}px;"><td colspan="${columnCount}"></td></tr>` : '';
+}
 
-    const sorted = arr.slice().sort((a, b) => a - b);
-    const index = Math.ceil((percentile / 100) * sorted.length) - 1;
+// 一个SKU的数据行（页内第row行，各矩阵按行展开，每行weekCount个值）
+function gapRow(page, row, weekCount) {
+    const offset = row * weekCount;
+    let html = `<tr><td class="sku-cell">${page.skus[row]}</td>`;
+    html += `<td>${page.weighted_gaps[row].toLocaleString()}</td>`;
+
+    // GAP差异列（高亮top30%）
+    for (let j = 0; j < weekCount; j++) {
+        const value = page.gap[offset + j];
+        let className = 'gap-column ' + (value > 0 ? 'positive' : (value < 0 ? 'negative' : 'zero'));
+        if (Math.abs(value) >= gapView.threshold && Math.abs(value) > 0) {
+            className += ' highlight';
+        }
+        html += `<td class="${className}">${value.toLocaleString()}</td>`;
+    }
+
+    // 排程目标列
+    for (let j = 0; j < weekCount; j++) {
+        html += `<td class="schedule-column">${page.schedule[offset + j].toLocaleString()}</td>`;
+    }
+
+    // PO汇总结果列
+    for (let j = 0; j < weekCount; j++) {
+        html += `<td class="po-column">${page.po[offset + j].toLocaleString()}</td>`;
+    }
 
-    return sorted[index] || 0;
+    return html + '</tr>';
 }
 
 // 下载差异分析表
@@ -627,7 +870,7 @@ function downloadGapAnalysis() {
         return;
     }
 
-    window.location.href = `/api/download/${currentGapAnalysisFile}`;
+    window.location.href = resultFileUrl('download', currentGapAnalysisFile);
     showToast('开始下载差异分析表...', 'success');
 }
 
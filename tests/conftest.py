@@ -0,0 +1,9 @@
+# -*- coding: utf-8 -*-
+"""
+pytest配置 - 把项目根目录加入导入路径，直接运行pytest时也能导入src包
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+贪心分配回归测试 - 向量化的POOptimizer._greedy_assign与逐周打分的标量实现结果一致
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.core.po_adjustment import POOptimizer
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SCHEDULE_FILE = os.path.join(PROJECT_ROOT, 'data/input/shechle_aim.xlsx')
+PO_FILE = os.path.join(PROJECT_ROOT, 'data/input/po_lists.xlsx')
+
+
+def reference_greedy_assign(po_qty, original_days, candidate_weeks, candidate_days, target_weekly, weights):
+    """
+    标量参考实现（与向量化前的逐周循环相同）：依次把每个PO试放到每个候选周，
+    计算全部周的加权偏差之和加上日期距离，取得分最小（相同时取靠前）的候选周
+    """
+    load = {}
+    assigned = []
+    for qty, original_day in zip(po_qty, original_days):
+        best_week, best_score = None, float('inf')
+        for week, day in zip(candidate_weeks, candidate_days):
+            trial = dict(load)
+            trial[week] = trial.get(week, 0) + qty
+            deviation = sum(weights[w] * abs(trial.get(w, 0) - target_weekly[w]) for w in range(len(target_weekly)))
+            score = deviation + abs(day - original_day) / 100.0 * 0.01
+            if score < best_score:
+                best_week, best_score = week, score
+        load[best_week] = load.get(best_week, 0) + qty
+        assigned.append(best_week)
+    return np.asarray(assigned, dtype=np.int64)
+
+
+def test_fixed_schedule_matches_reference():
+    """固定的小规模排程：前4周高权重，含目标为0的周和重复数量的PO"""
+    target_weekly = np.array([0, 500, 1200, 0, 800, 800, 300, 0, 1500, 600, 0, 400], dtype=float)
+    weights = np.where(np.arange(len(target_weekly)) < 4, 10.0, 1.0)
+    candidate_weeks = np.arange(1, len(target_weekly))
+    candidate_days = 20000 + candidate_weeks * 7
+    po_qty = np.array([600, 600, 300, 1000, 250, 250, 900, 400, 400, 1200, 100], dtype=float)
+    original_days = 20000 + np.array([3, 10, 10, 24, 31, 31, 45, 52, 60, 66, 80])
+
+    expected = reference_greedy_assign(po_qty, original_days, candidate_weeks, candidate_days,
+                                       target_weekly, weights)
+    actual = POOptimizer._greedy_assign(po_qty, original_days, candidate_weeks, candidate_days,
+                                        target_weekly, weights)
+    np.testing.assert_array_equal(actual, expected)
+
+
+@pytest.mark.skipif(not (os.path.exists(SCHEDULE_FILE) and os.path.exists(PO_FILE)), reason='缺少示例数据')
+def test_sample_data_matches_reference():
+    """示例数据的全部SKU：每个PO的贪心分配与标量实现一致"""
+    optimizer = POOptimizer(SCHEDULE_FILE, PO_FILE)
+    all_qty = optimizer.po_lists['数量'].to_numpy(dtype=float)
+    all_days = optimizer.po_lists['修改要货日期'].to_numpy(dtype='datetime64[D]').astype(np.int64)
+
+    checked = 0
+    for sku, row_ids in optimizer.po_lists.groupby('SKU').indices.items():
+        task = optimizer._build_sku_task(sku, row_ids, all_qty[row_ids], all_days[row_ids])
+        if task is None:
+            continue
+        args = (task['po_qty'], task['original_days'], task['candidate_weeks'], task['candidate_days'],
+                task['target_weekly'], task['weights'])
+        np.testing.assert_array_equal(POOptimizer._greedy_assign(*args), reference_greedy_assign(*args),
+                                      err_msg=f"SKU {sku}")
+        checked += len(row_ids)
+
+    assert checked > 0